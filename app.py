@@ -1,13 +1,29 @@
+import importlib
 import streamlit as st
-import pandas as pd
-from pages.landing import show as show_landing
-from pages.auth import show as show_auth  
-from pages.assessment import show as show_assessment
-from pages.dashboard import show as show_dashboard
-from utils.data_manager import initialize_data_files
+from utils import instrumentation
 
-# Initialize data files
-initialize_data_files()
+# Page modules are imported on first navigation so the landing page does not
+# pay for pandas, numpy and plotly; Python keeps them loaded afterwards.
+PAGE_MODULES = {
+    'landing': 'pages.landing',
+    'auth': 'pages.auth',
+    'assessment': 'pages.assessment',
+    'dashboard': 'pages.dashboard',
+    # Admin timing panel, rendered below the current page; kept out of pages/
+    # so Streamlit does not list it in every visitor's sidebar
+    'debug': 'utils.debug_panel'
+}
+
+def load_page(page):
+    """Import a page module on demand and return its show() function (timed as page.<name>)"""
+    return instrumentation.timed(f'page.{page}')(importlib.import_module(PAGE_MODULES[page]).show)
+
+@st.cache_resource(show_spinner=False)
+def initialize_data_files_once():
+    """Create the data files once per server process instead of on every rerun"""
+    from utils.data_manager import initialize_data_files
+    initialize_data_files()
+    return True
 
 # Configure page
 st.set_page_config(
@@ -86,19 +102,27 @@ def navigate_to(page):
     st.rerun()
 
 # Page routing
+if st.session_state.page != 'landing':
+    # Every page except the landing page reads or writes user data
+    initialize_data_files_once()
+
 if st.session_state.page == 'landing':
-    show_landing()
+    load_page('landing')()
 elif st.session_state.page == 'auth':
-    show_auth()
+    load_page('auth')()
 elif st.session_state.page == 'assessment':
     if st.session_state.user_logged_in:
-        show_assessment()
+        load_page('assessment')()
     else:
         st.error("Please log in to access this page.")
-        show_landing()
+        load_page('landing')()
 elif st.session_state.page == 'dashboard':
     if st.session_state.user_logged_in:
-        show_dashboard()
+        load_page('dashboard')()
     else:
         st.error("Please log in to access this page.")
-        show_landing()
+        load_page('landing')()
+
+# Timing panel for admins (HEALTH_MANAGER_ADMINS) when instrumentation is enabled
+if instrumentation.ENABLED and instrumentation.is_admin(st.session_state.username):
+    load_page('debug')()
@@ -1,6 +1,6 @@
 import streamlit as st
 from utils.health_calculator import calculate_bmi, calculate_bmr, calculate_target_calories, get_bmi_category
-from utils.data_manager import save_user_profile
+from utils.data_manager import save_user_profile, log_measurement
 
 def show():
     st.markdown('<h1 class="main-header">📋 Health Assessment</h1>', unsafe_allow_html=True)
@@ -113,10 +113,12 @@ def show():
                 'target_calories': target_calories
             }
             
-            # Save profile
-            success, message = save_user_profile(st.session_state.username, profile_data)
+            # Save profile (waiting for the write, so success means it is stored)
+            success, message = save_user_profile(st.session_state.username, profile_data, wait=True)
             
             if success:
+                # Every assessment is also a weigh-in for progress tracking
+                log_measurement(st.session_state.username, weight_kg)
                 st.success("✅ Health profile created successfully!")
                 st.session_state.assessment_completed = True
                 
@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.data_manager import create_user, authenticate_user
+from utils.data_manager import create_user, authenticate_user, resolve_username
+from utils.session_cache import get_session_profile
 import re
 
 def show():
@@ -29,25 +30,25 @@ def show_login():
         col1, col2, col3 = st.columns([1, 2, 1])
         
         with col2:
-            username = st.text_input("Username", placeholder="Enter your username")
+            identifier = st.text_input("Username or Email", placeholder="Enter your username or email")
             password = st.text_input("Password", type="password", placeholder="Enter your password")
             
             submitted = st.form_submit_button("🔓 Login", type="primary", use_container_width=True)
             
             if submitted:
-                if not username or not password:
+                if not identifier or not password:
                     st.error("Please fill in all fields")
                 else:
-                    success, message = authenticate_user(username, password)
+                    success, message = authenticate_user(identifier, password)
                     
                     if success:
+                        username = resolve_username(identifier)
                         st.session_state.user_logged_in = True
                         st.session_state.username = username
                         st.success(f"Welcome back, {username}!")
                         
-                        # Check if user has a profile
-                        from utils.data_manager import get_user_profile
-                        profile, _ = get_user_profile(username)
+                        # Check if user has a profile (also warms the session cache for the dashboard)
+                        profile, _ = get_session_profile(username)
                         
                         if profile:
                             st.session_state.page = 'dashboard'
@@ -1,9 +1,26 @@
+import os
+import zlib
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from utils.data_manager import get_user_profile, get_food_recommendations, get_exercise_recommendations
+from utils.data_manager import search_foods, get_weight_history, log_measurement
+from utils.session_cache import get_session_profile, invalidate_session_profile
 from utils.health_calculator import get_bmi_category, get_macronutrient_split, get_health_recommendations
+from utils.timeseries import RollingTrends, downsample_indices, bucket_stats
+from utils.figures import get_bmi_gauge, get_macro_pie
+from utils.meal_planner import generate_meal_plan
+from utils.workout_scheduler import generate_weekly_schedule, DAYS
+from utils.card_grid import food_recommendations_html, exercise_recommendations_html, meal_plan_grid, schedule_grid
+from utils.instrumentation import timed
+
+# Maximum number of points sent to the browser per progress chart, across
+# all of its traces (weight, 7-day and 30-day averages, and the range band)
+CHART_POINT_BUDGET = int(os.environ.get('HEALTH_MANAGER_CHART_POINTS', 500))
+
+# Tabs render as fragments: a tab switch, or a widget inside a tab, reruns
+# only that fragment instead of the whole page. Streamlit versions without
+# fragments render them as part of the full rerun.
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
 
 def show():
     # Check if user is logged in
@@ -11,8 +28,8 @@ def show():
         st.error("Please log in to access this page")
         return
     
-    # Get user profile
-    profile, message = get_user_profile(st.session_state.username)
+    # Get user profile (cached in the session until it is saved again)
+    profile, message = get_session_profile(st.session_state.username)
     
     if not profile:
         st.error("Profile not found. Please complete your health assessment first.")
@@ -25,6 +42,34 @@ def show():
     st.markdown(f'<h1 class="main-header">🎯 Welcome, {st.session_state.username}!</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Your Personalized Health Dashboard</p>', unsafe_allow_html=True)
     
+    show_tabs(profile)
+    
+    # Footer navigation
+    st.markdown("---")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("📋 Update Assessment"):
+            st.session_state.page = 'assessment'
+            st.rerun()
+    
+    with col2:
+        if st.button("🔓 Logout"):
+            invalidate_session_profile()
+            st.session_state.user_logged_in = False
+            st.session_state.username = None
+            st.session_state.page = 'landing'
+            st.rerun()
+    
+    with col3:
+        if st.button("🏠 Home"):
+            st.session_state.page = 'landing'
+            st.rerun()
+
+@fragment
+@timed()
+def show_tabs(profile):
+    """Tab buttons and the active tab; a tab switch reruns only this fragment"""
     # Navigation menu
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -55,28 +100,9 @@ def show():
         show_exercise_plan(profile)
     elif st.session_state.dashboard_tab == 'progress':
         show_progress(profile)
-    
-    # Footer navigation
-    st.markdown("---")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        if st.button("📋 Update Assessment"):
-            st.session_state.page = 'assessment'
-            st.rerun()
-    
-    with col2:
-        if st.button("🔓 Logout"):
-            st.session_state.user_logged_in = False
-            st.session_state.username = None
-            st.session_state.page = 'landing'
-            st.rerun()
-    
-    with col3:
-        if st.button("🏠 Home"):
-            st.session_state.page = 'landing'
-            st.rerun()
 
+@fragment
+@timed()
 def show_overview(profile):
     st.markdown("### 📊 Health Overview")
     
@@ -131,43 +157,12 @@ def show_overview(profile):
     col1, col2 = st.columns(2)
     
     with col1:
-        # BMI Chart
-        fig_bmi = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = profile['bmi'],
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "BMI Status"},
-            gauge = {
-                'axis': {'range': [None, 40]},
-                'bar': {'color': bmi_color},
-                'steps': [
-                    {'range': [0, 18.5], 'color': "#FFF3E0"},
-                    {'range': [18.5, 25], 'color': "#E8F5E8"},
-                    {'range': [25, 30], 'color': "#FFF3E0"},
-                    {'range': [30, 40], 'color': "#FFEBEE"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 30
-                }
-            }
-        ))
-        fig_bmi.update_layout(height=300)
-        st.plotly_chart(fig_bmi, use_container_width=True)
+        # BMI Chart (figures are cached and shared, so never modify them here)
+        st.plotly_chart(get_bmi_gauge(profile['bmi']), use_container_width=True)
     
     with col2:
         # Macronutrient breakdown
-        macros = get_macronutrient_split(profile['goal'], profile['target_calories'])
-        
-        fig_macro = px.pie(
-            values=[macros['protein'], macros['carbs'], macros['fat']],
-            names=['Protein', 'Carbohydrates', 'Fat'],
-            title="Daily Macronutrient Breakdown (grams)",
-            color_discrete_sequence=['#4CAF50', '#81C784', '#A5D6A7']
-        )
-        fig_macro.update_layout(height=300)
-        st.plotly_chart(fig_macro, use_container_width=True)
+        st.plotly_chart(get_macro_pie(profile['goal'], profile['target_calories']), use_container_width=True)
     
     # Health recommendations
     st.markdown("### 💡 Personalized Health Recommendations")
@@ -180,6 +175,8 @@ def show_overview(profile):
         </div>
         """, unsafe_allow_html=True)
 
+@fragment
+@timed()
 def show_diet_plan(profile):
     st.markdown("### 🥗 Personalized Diet Plan")
     
@@ -211,31 +208,49 @@ def show_diet_plan(profile):
         </div>
         """, unsafe_allow_html=True)
     
+    # One-day meal plan solved for the calorie and macro targets
+    st.markdown("#### 🍽️ Today's Meal Plan")
+    plan = generate_meal_plan(profile['diet_preference'], profile['goal'], profile['target_calories'])
+    
+    if plan is not None:
+        st.markdown(meal_plan_grid(plan['foods']), unsafe_allow_html=True)
+        
+        totals, targets = plan['totals'], plan['targets']
+        st.caption(
+            f"Plan total: {totals['calories']:.0f} of {targets['calories']:.0f} cal · "
+            f"{totals['protein']:.0f}/{targets['protein']:.0f}g protein · "
+            f"{totals['carbs']:.0f}/{targets['carbs']:.0f}g carbs · "
+            f"{totals['fat']:.0f}/{targets['fat']:.0f}g fat"
+        )
+        if not plan['within_tolerance']:
+            st.info("Only a few foods match your diet preference, so this plan cannot fully reach your targets.")
+    else:
+        st.warning("No meal plan available. Please check your diet preferences.")
+    
     # Food recommendations
     st.markdown("#### 🍽️ Recommended Foods")
-    foods = get_food_recommendations(profile['diet_preference'], profile['goal'], 12)
-    
-    if not foods.empty:
-        # Create food cards
-        for i in range(0, len(foods), 3):
-            cols = st.columns(3)
-            for j in range(3):
-                if i + j < len(foods):
-                    food = foods.iloc[i + j]
-                    with cols[j]:
-                        st.markdown(f"""
-                        <div class="feature-card">
-                            <h5>{food['food_name']}</h5>
-                            <p><strong>Category:</strong> {food['category']}</p>
-                            <p><strong>Calories:</strong> {food['calories_per_100g']}/100g</p>
-                            <p><strong>Protein:</strong> {food['protein']}g</p>
-                            <p><strong>Carbs:</strong> {food['carbs']}g</p>
-                            <p><strong>Fat:</strong> {food['fat']}g</p>
-                        </div>
-                        """, unsafe_allow_html=True)
+    # The whole grid of food cards is one element (cached per diet and goal)
+    foods_html = food_recommendations_html(profile['diet_preference'], profile['goal'], 12)
+    
+    if foods_html is not None:
+        st.markdown(foods_html, unsafe_allow_html=True)
     else:
         st.warning("No food recommendations available. Please check your diet preferences.")
     
+    # Food search over the whole catalog
+    st.markdown("#### 🔍 Food Search")
+    query = st.text_input("Search foods", key='food_search', placeholder="e.g. chicken, oats, yogurt")
+    
+    if query.strip():
+        results = search_foods(query, 20)
+        if not results.empty:
+            st.dataframe(
+                results[['food_name', 'category', 'calories_per_100g', 'protein', 'carbs', 'fat', 'fiber', 'diet_type']],
+                hide_index=True
+            )
+        else:
+            st.info(f"No foods found matching \"{query.strip()}\".")
+    
     # Meal planning tips
     st.markdown("#### 📋 Meal Planning Tips")
     meal_tips = {
@@ -269,6 +284,8 @@ def show_diet_plan(profile):
     for tip in tips:
         st.markdown(f"• {tip}")
 
+@fragment
+@timed()
 def show_exercise_plan(profile):
     st.markdown("### 💪 Personalized Exercise Plan")
     
@@ -288,87 +305,49 @@ def show_exercise_plan(profile):
     """, unsafe_allow_html=True)
     
     # Exercise recommendations
-    exercises = get_exercise_recommendations(profile['goal'], 12)
+    # Cards grouped by category, sent as one element (cached per goal)
+    exercises_html = exercise_recommendations_html(profile['goal'], 12)
     
-    if not exercises.empty:
+    if exercises_html is not None:
         st.markdown("#### 🏃‍♂️ Recommended Exercises")
-        
-        # Group exercises by category
-        categories = exercises['category'].unique()
-        
-        for category in categories:
-            category_exercises = exercises[exercises['category'] == category]
-            
-            st.markdown(f"##### {category.title()} Exercises")
-            
-            for _, exercise in category_exercises.iterrows():
-                col1, col2 = st.columns([2, 1])
-                
-                with col1:
-                    intensity_color = {
-                        'Low': '#4CAF50',
-                        'Medium': '#FF9800', 
-                        'High': '#F44336'
-                    }
-                    
-                    st.markdown(f"""
-                    <div style="background: #F9F9F9; padding: 1rem; border-radius: 8px; margin: 0.5rem 0;">
-                        <h6>{exercise['exercise_name']}</h6>
-                        <p><strong>Target:</strong> {exercise['target_muscle']}</p>
-                        <p><strong>Intensity:</strong> <span style="color: {intensity_color.get(exercise['intensity'], '#666')};">{exercise['intensity']}</span></p>
-                        <p><strong>Equipment:</strong> {exercise['equipment_needed']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h6>Duration</h6>
-                        <h4>{exercise['duration_minutes']} min</h4>
-                        <p>{exercise['calories_per_hour']} cal/hr</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+        st.markdown(exercises_html, unsafe_allow_html=True)
     else:
         st.warning("No exercise recommendations available.")
     
-    # Weekly plan suggestion
+    # Weekly schedule sized to the goal's calorie-burn target
     st.markdown("#### 📅 Weekly Exercise Schedule")
     
-    weekly_plans = {
-        'weight_loss': {
-            'Cardio': '4-5 times per week',
-            'Strength Training': '2-3 times per week',
-            'Rest Days': '1-2 days'
-        },
-        'muscle_building': {
-            'Strength Training': '4-5 times per week',
-            'Cardio': '2-3 times per week (light)',
-            'Rest Days': '1-2 days'
-        },
-        'weight_gain': {
-            'Strength Training': '3-4 times per week',
-            'Cardio': '2 times per week (moderate)',
-            'Rest Days': '2-3 days'
-        },
-        'maintenance': {
-            'Cardio': '3-4 times per week',
-            'Strength Training': '2-3 times per week',
-            'Rest Days': '1-2 days'
-        }
-    }
-    
-    plan = weekly_plans.get(profile['goal'], weekly_plans['maintenance'])
+    # Seeded per user, so everyone keeps the same week across reruns
+    schedule = generate_weekly_schedule(profile['goal'], profile['weight_kg'], seed=zlib.crc32(profile['username'].encode()))
     
-    col1, col2, col3 = st.columns(3)
-    for i, (activity, frequency) in enumerate(plan.items()):
-        with [col1, col2, col3][i % 3]:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h6>{activity}</h6>
-                <p>{frequency}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    if schedule is not None:
+        st.markdown(schedule_grid(schedule['sessions'], DAYS), unsafe_allow_html=True)
+        
+        st.caption(f"Weekly burn: about {schedule['total_calories']} of {schedule['target_calories']} cal target · rest on {', '.join(schedule['rest_days'])}")
+    else:
+        st.warning("No exercise schedule available.")
+
+def get_weight_trends(username, start):
+    """Session-cached RollingTrends for the user, extended with new weigh-ins only
+    
+    The tracker is rebuilt only when a wider window is requested; otherwise
+    each rerun queries just the weigh-ins logged since the last one seen.
+    """
+    lookback = None if start is None else start - pd.Timedelta(days=30)
+    trackers = st.session_state.setdefault('weight_trends', {})
+    trends = trackers.get(username)
+    
+    if trends is None or not trends.covers(lookback):
+        trends = RollingTrends(windows_days=(7, 30), origin=lookback)
+        trackers[username] = trends
+        trends.extend(get_weight_history(username, start=lookback))
+    else:
+        since = trends.last_timestamp + pd.Timedelta(seconds=1) if len(trends) else lookback
+        trends.extend(get_weight_history(username, start=since))
+    return trends
 
+@fragment
+@timed()
 def show_progress(profile):
     st.markdown("### 📈 Progress Tracking")
     
@@ -390,34 +369,82 @@ def show_progress(profile):
         days_since = (pd.Timestamp.now() - pd.to_datetime(profile['created_date'])).days
         st.metric("Days Active", f"{days_since}")
     
-    # Progress chart placeholder
+    # Weight history chart (only the selected window is read from storage)
     st.markdown("#### 📉 Weight Progress Chart")
     
-    # Sample progress data for visualization
-    import numpy as np
-    dates = pd.date_range(start=profile['created_date'], periods=30, freq='D')
-    
-    # Simulate weight progress based on goal
-    if profile['goal'] == 'weight_loss':
-        weights = np.linspace(profile['weight_kg'], profile['weight_kg'] - 2, 30) + np.random.normal(0, 0.2, 30)
-    elif profile['goal'] == 'weight_gain':
-        weights = np.linspace(profile['weight_kg'], profile['weight_kg'] + 2, 30) + np.random.normal(0, 0.2, 30)
+    windows = {
+        'Last 30 days': 30,
+        'Last 90 days': 90,
+        'Last year': 365,
+        'All time': None
+    }
+    window = st.selectbox("Time range", list(windows), index=1, key='progress_window')
+    start = None
+    if windows[window] is not None:
+        start = pd.Timestamp.now().normalize() - pd.Timedelta(days=windows[window])
+    trends = get_weight_trends(st.session_state.username, start)
+    history = trends.frame(start)
+    
+    if history.empty:
+        st.info("No weigh-ins recorded for this period yet. Log your weight below to start tracking your progress.")
     else:
-        weights = np.full(30, profile['weight_kg']) + np.random.normal(0, 0.3, 30)
-    
-    progress_df = pd.DataFrame({
-        'Date': dates,
-        'Weight': weights
-    })
-    
-    fig = px.line(progress_df, x='Date', y='Weight', title='Weight Progress Over Time')
-    fig.update_traces(line_color='#2E7D32', line_width=3)
-    fig.update_layout(
-        xaxis_title="Date",
-        yaxis_title="Weight (kg)",
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
+        # Send at most CHART_POINT_BUDGET points to the browser: the three
+        # lines share it, plus the two edges of the range band when downsampled
+        trace_points = CHART_POINT_BUDGET // 3
+        if len(history) > trace_points:
+            trace_points = CHART_POINT_BUDGET // 5
+        kept = downsample_indices(history.index, history['weight_kg'].to_numpy(), trace_points)
+        chart_df = history.iloc[kept]
+        
+        fig = go.Figure()
+        if len(kept) < len(history):
+            # Shade the full min/max range that the downsampled line summarizes
+            band = bucket_stats(history.index, history['weight_kg'].to_numpy(), trace_points)
+            fig.add_trace(go.Scatter(x=band.index, y=band['max'], line_width=0, showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(
+                x=band.index, y=band['min'], line_width=0, fill='tonexty',
+                fillcolor='rgba(129, 199, 132, 0.25)', name='Range', hoverinfo='skip'
+            ))
+        fig.add_trace(go.Scatter(
+            x=chart_df.index, y=chart_df['weight_kg'], name='Weight',
+            mode='lines+markers' if len(chart_df) < 60 else 'lines',
+            line=dict(color='#2E7D32', width=3)
+        ))
+        fig.add_trace(go.Scatter(x=chart_df.index, y=chart_df['trend_7d'], name='7-day average', line=dict(color='#81C784', width=2, dash='dot')))
+        fig.add_trace(go.Scatter(x=chart_df.index, y=chart_df['trend_30d'], name='30-day average', line=dict(color='#FF9800', width=2, dash='dash')))
+        fig.update_layout(
+            title='Weight Progress Over Time',
+            xaxis_title="Date",
+            yaxis_title="Weight (kg)",
+            legend=dict(orientation='h', y=-0.2)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        latest = trends.latest()
+        st.caption(f"7-day average: {latest[7]:.1f} kg · 30-day average: {latest[30]:.1f} kg · showing {len(chart_df)} of {len(history)} weigh-ins")
+    
+    # Log a new weigh-in
+    with st.form("log_weight_form", clear_on_submit=True):
+        st.markdown("##### ⚖️ Log Today's Weight")
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            default_weight = float(history['weight_kg'].iloc[-1]) if not history.empty else float(profile['weight_kg'])
+            weight_kg = st.number_input("Weight (kg)", min_value=30.0, max_value=300.0, value=default_weight, step=0.1)
+        
+        with col2:
+            body_fat_pct = st.number_input("Body Fat % (optional)", min_value=2.0, max_value=70.0, value=None, step=0.1)
+        
+        with col3:
+            waist_cm = st.number_input("Waist (cm, optional)", min_value=40.0, max_value=250.0, value=None, step=0.5)
+        
+        if st.form_submit_button("➕ Log Weight", type="primary"):
+            success, message = log_measurement(st.session_state.username, weight_kg, body_fat_pct, waist_cm)
+            if success:
+                st.success("Weight logged!")
+                st.rerun()
+            else:
+                st.error(message)
     
     # Goals and achievements
     st.markdown("#### 🎯 Goals & Achievements")
@@ -0,0 +1,267 @@
+"""Throughput/latency benchmark of data_manager and health_calculator at scale
+
+    python -m scripts.benchmark
+    python -m scripts.benchmark --users 1000 1000000 --foods 100 100000 --storage sqlite csv
+    python -m scripts.benchmark --save baseline.json
+    python -m scripts.benchmark --compare baseline.json --threshold 0.25
+
+For every --users scale, synthetic users.csv/user_profiles.csv files are
+written into a temporary directory, and the user operations run against
+each --storage backend:
+- create_user
+- authenticate_user
+- get_user_profile
+- save_user_profile
+For every --foods scale, a synthetic foods.csv (resampled from the real
+catalog) is written, and the two recommendation functions run against it.
+The scalar calculator functions run once, and the batch calculator runs
+over each generated profile table.
+
+Every operation is called up to --repeat times or until --budget seconds
+have passed, whichever comes first. Inputs are drawn from a seeded RNG,
+so runs are reproducible. --save writes the results as a JSON baseline.
+--compare reads one back and exits with status 1 if any operation's p50
+latency or throughput got worse by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from utils import catalog, data_manager, passwords
+from utils.health_calculator import (
+    calculate_bmi, calculate_bmr, calculate_target_calories, get_macronutrient_split,
+    get_health_recommendations, calculate_health_metrics_batch, ACTIVITY_MULTIPLIERS
+)
+from utils.storage import create_storage
+from scripts.benchmark_catalog_memory import write_catalog
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'bench-password'
+GENDERS = ['male', 'female']
+
+def measure(operation, arguments, repeat, budget, finish=None):
+    """Call operation(argument) for each argument (up to `repeat`, within `budget` seconds)
+
+    Returns per-call latencies and the throughput over the whole run,
+    including finish() (e.g. draining a write-behind queue) if given.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for i in range(repeat):
+        argument = arguments[i % len(arguments)]
+        call_start = time.perf_counter()
+        operation(argument)
+        latencies.append(time.perf_counter() - call_start)
+        if time.perf_counter() - start > budget and len(latencies) >= 3:
+            break
+    if finish is not None:
+        finish()
+    wall = time.perf_counter() - start
+    latencies = np.array(latencies)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'calls': len(latencies), 'ops_per_s': len(latencies) / wall,
+        'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99
+    }
+
+def write_users(directory, rows, rng):
+    """users.csv and user_profiles.csv with `rows` users u0..u{rows-1}, all sharing PASSWORD"""
+    usernames = pd.Series(np.arange(rows)).astype(str).radd('u')
+    pd.DataFrame({
+        'username': usernames,
+        'password_hash': passwords.hash_password(PASSWORD),
+        'email': usernames + '@example.com',
+        'created_date': '2025-01-01 00:00:00'
+    }).to_csv(os.path.join(directory, 'users.csv'), index=False)
+
+    profiles = pd.DataFrame({
+        'username': usernames,
+        'age': rng.integers(18, 80, rows),
+        'gender': rng.choice(GENDERS, rows),
+        'height_cm': rng.integers(150, 200, rows),
+        'weight_kg': rng.uniform(45, 120, rows).round(1),
+        'activity_level': rng.choice(list(ACTIVITY_MULTIPLIERS), rows),
+        'goal': rng.choice(data_manager.GOALS, rows),
+        'diet_preference': rng.choice(data_manager.DIET_PREFERENCES, rows)
+    })
+    metrics = calculate_health_metrics_batch(profiles)
+    for column in ['bmi', 'bmr', 'target_calories']:
+        profiles[column] = np.round(metrics[column], 1)
+    profiles['created_date'] = '2025-01-01 00:00:00'
+    profiles.to_csv(os.path.join(directory, 'user_profiles.csv'), index=False)
+    return profiles
+
+def _login(username):
+    # Every login pays the KDF, not a verification-cache hit
+    passwords.clear_verification_cache()
+    success, message = data_manager.authenticate_user(username, PASSWORD)
+    if not success:
+        raise RuntimeError(message)
+
+def bench_users(storage_name, profiles, rng, repeat, budget):
+    """Results of the user operations against a fresh `storage_name` store in the current directory"""
+    for name in ['health_manager.db', 'health_manager.db-wal', 'health_manager.db-shm']:
+        if os.path.exists(name):
+            os.remove(name)
+    data_manager.set_storage(create_storage(storage_name))
+    data_manager.initialize_data_files()
+
+    usernames = profiles['username'].to_numpy()
+    sample = list(rng.choice(usernames, min(repeat, len(usernames))))
+    records = profiles.sample(min(repeat, len(profiles)), random_state=0).to_dict('records')
+    # The CSV backend appends to users.csv, so new names are unique per backend
+    prefix = f'new_{storage_name}_'
+    return {
+        'create_user': measure(
+            lambda i: data_manager.create_user(f'{prefix}{i}', PASSWORD, f'{prefix}{i}@example.com'),
+            range(repeat), repeat, budget
+        ),
+        'authenticate_user': measure(_login, sample, repeat, budget),
+        'get_user_profile': measure(data_manager.get_user_profile, sample, repeat, budget),
+        'save_user_profile': measure(
+            lambda record: data_manager.save_user_profile(record['username'], dict(record)),
+            records, repeat, budget, finish=data_manager.flush_profile_writes
+        )
+    }
+
+def bench_catalog(rng, repeat, budget):
+    """Results of the recommendation functions against the foods.csv in the current directory"""
+    combos = [
+        (diet, goal) for diet in data_manager.DIET_PREFERENCES for goal in data_manager.GOALS
+    ]
+    combos = [combos[i] for i in rng.permutation(len(combos))]
+    goals = list(rng.choice(data_manager.GOALS, repeat))
+
+    def cold_load(_):
+        catalog.clear_catalogs()
+        data_manager.get_food_recommendations('vegetarian', 'weight_loss')
+
+    return {
+        'food_catalog_cold': measure(cold_load, [None], min(repeat, 5), budget),
+        'get_food_recommendations': measure(
+            lambda combo: data_manager.get_food_recommendations(*combo), combos, repeat, budget
+        ),
+        'get_exercise_recommendations': measure(data_manager.get_exercise_recommendations, goals, repeat, budget)
+    }
+
+def bench_calculator(rng, repeat, budget):
+    """Results of the scalar calculator functions on random inputs"""
+    n = max(repeat, 1)
+    weights, heights = rng.uniform(45, 120, n), rng.integers(150, 200, n)
+    ages, genders = rng.integers(18, 80, n), rng.choice(GENDERS, n)
+    activity, goals = rng.choice(list(ACTIVITY_MULTIPLIERS), n), rng.choice(data_manager.GOALS, n)
+    rows = range(n)
+    return {
+        'calculate_bmi': measure(lambda i: calculate_bmi(weights[i], heights[i]), rows, repeat, budget),
+        'calculate_bmr': measure(lambda i: calculate_bmr(weights[i], heights[i], ages[i], genders[i]), rows, repeat, budget),
+        'calculate_target_calories': measure(
+            lambda i: calculate_target_calories(1500 + i % 500, activity[i], goals[i]), rows, repeat, budget
+        ),
+        'get_macronutrient_split': measure(lambda i: get_macronutrient_split(goals[i], 1500 + i % 1500), rows, repeat, budget),
+        'get_health_recommendations': measure(lambda i: get_health_recommendations(15 + i % 25, goals[i]), rows, repeat, budget)
+    }
+
+def run(args):
+    """Run every benchmark; returns {'<scope>/<operation>': result}"""
+    rng = np.random.default_rng(args.seed)
+    results = {}
+
+    def add(scope, scope_results):
+        for operation, result in scope_results.items():
+            results[f'{scope}/{operation}'] = result
+        print_table(scope, scope_results)
+
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            shutil.copy(os.path.join(REPOSITORY, 'exercises.csv'), directory)
+            add('calculator', bench_calculator(rng, args.repeat, args.budget))
+            for users in args.users:
+                profiles = write_users(directory, users, rng)
+                add(f'users={users}', {
+                    'calculate_health_metrics_batch': measure(
+                        calculate_health_metrics_batch, [profiles], args.repeat, args.budget
+                    )
+                })
+                for storage_name in args.storage:
+                    add(f'{storage_name}/users={users}', bench_users(storage_name, profiles, rng, args.repeat, args.budget))
+            for foods in args.foods:
+                write_catalog(directory, foods, seed=args.seed)
+                add(f'foods={foods}', bench_catalog(rng, args.repeat, args.budget))
+        finally:
+            data_manager.flush_profile_writes()
+            catalog.clear_catalogs()
+            os.chdir(previous)
+    return results
+
+def print_table(scope, scope_results):
+    print(f"\n[{scope}]")
+    print(f"{'operation':<32} {'calls':>6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for operation, r in scope_results.items():
+        print(f"{operation:<32} {r['calls']:>6} {r['ops_per_s']:>10.1f} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}")
+
+def compare(results, baseline, threshold):
+    """Print the change against `baseline`; returns the keys that regressed beyond `threshold`"""
+    regressions = []
+    print(f"\nCompared with baseline (threshold {threshold:.0%}):")
+    print(f"{'benchmark':<56} {'p50':>8} {'ops/s':>8}")
+    for key, current in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        latency_change = current['p50_ms'] / max(before['p50_ms'], 1e-9) - 1
+        throughput_change = current['ops_per_s'] / max(before['ops_per_s'], 1e-9) - 1
+        regressed = latency_change > threshold or throughput_change < -threshold
+        if regressed:
+            regressions.append(key)
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{key:<56} {latency_change:>+8.0%} {throughput_change:>+8.0%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark data_manager and health_calculator at scale")
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 100000], help="user/profile counts to generate")
+    parser.add_argument('--foods', type=int, nargs='+', default=[100, 10000], help="food catalog sizes to generate")
+    parser.add_argument('--storage', nargs='+', default=['sqlite', 'csv'], help="storage backends to test")
+    parser.add_argument('--repeat', type=int, default=200, help="maximum calls per operation")
+    parser.add_argument('--budget', type=float, default=2.0, help="maximum seconds per operation")
+    parser.add_argument('--scrypt-log2', type=int, default=10, help="log2(SCRYPT_N) used for the benchmark users")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help="write the results to this JSON baseline")
+    parser.add_argument('--compare', help="JSON baseline to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    passwords.SCRYPT_N = 2 ** args.scrypt_log2
+    results = run(args)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(), 'machine': platform.machine(),
+                    'scrypt_n': passwords.SCRYPT_N, 'repeat': args.repeat, 'seed': args.seed
+                },
+                'results': results
+            }, f, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nFAIL: {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print("\nOK: no regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Compare per-worker memory and cold-start time of CSV vs memory-mapped catalogs
+
+    python -m scripts.benchmark_catalog_memory
+    python -m scripts.benchmark_catalog_memory --foods 300000 --workers 4
+
+Writes a synthetic foods catalog of --foods rows into a temporary
+directory. Then, for each mode, starts --workers fresh processes that
+load the catalog and serve recommendations and a search. In "csv" mode
+every worker parses foods.csv itself. In "columnar" mode every worker maps
+foods.columnar/, which is built once up front. Each worker reports:
+- the time to its first recommendation
+- how much private (unshared) memory loading the catalog added
+- its proportional set size
+
+Linux only (reads /proc/self/smaps_rollup).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import multiprocessing
+import numpy as np
+import pandas as pd
+from utils.catalog import build_columnar
+
+def _memory_kb():
+    """(private, pss) memory of this process in kB"""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields['Private_Clean'] + fields['Private_Dirty'], fields['Pss']
+
+def _worker(directory, columnar, start_barrier, hold_barrier, results):
+    os.chdir(directory)
+    from utils import catalog, data_manager
+    catalog.COLUMNAR_CATALOGS = columnar
+    private_before, _ = _memory_kb()
+    start_barrier.wait()
+
+    start = time.perf_counter()
+    data_manager.get_food_recommendations('vegetarian', 'weight_loss', 12)
+    first = time.perf_counter() - start
+    for goal in data_manager.GOALS:
+        data_manager.get_food_recommendations('non_vegetarian', goal, 12)
+    data_manager.search_foods('chicken')
+
+    private_after, pss = _memory_kb()
+    results.put((first, private_after - private_before, pss))
+    # Stay alive until every worker has measured, so shared pages are counted as shared
+    hold_barrier.wait()
+
+def run_mode(directory, columnar, workers):
+    context = multiprocessing.get_context('spawn')
+    start_barrier, hold_barrier = context.Barrier(workers), context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(directory, columnar, start_barrier, hold_barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return np.array(outcomes)
+
+def write_catalog(directory, rows, seed=0):
+    """A foods.csv of `rows` items resampled (with jittered nutrients) from the real catalog"""
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'foods.csv')
+    rng = np.random.default_rng(seed)
+    foods = pd.read_csv(source).sample(rows, replace=True, random_state=seed).reset_index(drop=True)
+    for column in ['calories_per_100g', 'protein', 'carbs', 'fat', 'fiber']:
+        foods[column] = (foods[column] * rng.uniform(0.8, 1.2, rows)).round(1)
+    foods['food_name'] = foods['food_name'] + ' #' + pd.Series(np.arange(rows)).astype(str)
+    foods.to_csv(os.path.join(directory, 'foods.csv'), index=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-worker catalog memory: CSV vs memory-mapped")
+    parser.add_argument('--foods', type=int, default=200000, help="rows in the synthetic foods catalog")
+    parser.add_argument('--workers', type=int, default=4, help="worker processes per mode")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_catalog(directory, args.foods)
+        start = time.perf_counter()
+        build_columnar(os.path.join(directory, 'foods.csv'))
+        print(f"{args.foods} foods, {args.workers} workers per mode (columnar build took {time.perf_counter() - start:.1f}s)")
+        print(f"{'mode':>9} {'first rec ms':>13} {'catalog private MB':>19} {'PSS MB/worker':>14}")
+        for mode in ['csv', 'columnar']:
+            outcomes = run_mode(directory, mode == 'columnar', args.workers)
+            first, private, pss = np.median(outcomes, axis=0)
+            print(f"{mode:>9} {first * 1000:>13.1f} {private / 1024:>19.1f} {pss / 1024:>14.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Measure login latency for a range of scrypt cost settings
+
+    python -m scripts.benchmark_login
+    python -m scripts.benchmark_login --costs 12 14 16 --logins 200 --threads 8
+
+For every cost (log2 of SCRYPT_N) a throwaway SQLite store is created in a
+temporary directory, a user is registered, and `--logins` logins are run
+from `--threads` concurrent threads. The verification cache is cleared
+before every login so each one pays the full KDF cost.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils import data_manager, passwords
+from utils.storage import SQLiteStorage
+
+def measure(cost_log2, logins, threads):
+    """Return per-login latencies (seconds) at SCRYPT_N = 2 ** cost_log2"""
+    passwords.SCRYPT_N = 2 ** cost_log2
+    with tempfile.TemporaryDirectory() as tmp:
+        data_manager.set_storage(SQLiteStorage(
+            db_path=os.path.join(tmp, 'bench.db'),
+            users_csv=os.path.join(tmp, 'users.csv'),
+            profiles_csv=os.path.join(tmp, 'user_profiles.csv')
+        ))
+        data_manager.initialize_data_files()
+        data_manager.create_user('bench_user', 'bench-password', 'bench@example.com')
+
+        def login(_):
+            passwords.clear_verification_cache()
+            start = time.perf_counter()
+            success, message = data_manager.authenticate_user('bench_user', 'bench-password')
+            elapsed = time.perf_counter() - start
+            if not success:
+                raise RuntimeError(message)
+            return elapsed
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return np.array(list(pool.map(login, range(logins))))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark login latency per scrypt cost")
+    parser.add_argument('--costs', type=int, nargs='+', default=[12, 13, 14, 15, 16], help="log2(SCRYPT_N) values to test")
+    parser.add_argument('--logins', type=int, default=100, help="logins per cost setting")
+    parser.add_argument('--threads', type=int, default=4, help="concurrent login threads")
+    args = parser.parse_args(argv)
+
+    print(f"KDF pool workers: {passwords.KDF_WORKERS}, r={passwords.SCRYPT_R}, p={passwords.SCRYPT_P}")
+    print(f"{'N':>8} {'memory':>8} {'p50 ms':>9} {'p99 ms':>9} {'logins/s':>9}")
+    for cost in args.costs:
+        start = time.perf_counter()
+        latencies = measure(cost, args.logins, args.threads)
+        wall = time.perf_counter() - start
+        memory_mb = 128 * (2 ** cost) * passwords.SCRYPT_R / 2 ** 20
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"{2 ** cost:>8} {memory_mb:>6.0f}MB {p50:>9.1f} {p99:>9.1f} {args.logins / wall:>9.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
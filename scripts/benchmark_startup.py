@@ -0,0 +1,85 @@
+"""Measure time to first render of the landing page
+
+    python -m scripts.benchmark_startup
+    python -m scripts.benchmark_startup --runs 10 --app path/to/other/app.py
+
+Each run starts a fresh Python process, so nothing is cached between runs.
+The process imports Streamlit, then renders the app script once with
+Streamlit's AppTest. The time of that first render is reported. It covers
+the app's own imports and any startup work done at module level. The
+median of a few warm reruns is reported as well, together with the heavy
+libraries the landing page loaded.
+
+To compare against an older version, write that version's app.py to a
+file in the repository root and pass it with --app:
+
+    git show <commit>:app.py > app_before.py
+    python -m scripts.benchmark_startup --app app_before.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly.express', 'plotly.graph_objects']
+
+# Runs in the child process; prints one JSON line
+_CHILD = """
+import json, statistics, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=60)
+# AppTest itself imports some of these; only report what the app added
+already_loaded = set(sys.modules)
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+reruns = []
+for _ in range({reruns}):
+    start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - start)
+print(json.dumps({{
+    'first': first,
+    'rerun': statistics.median(reruns),
+    'errors': [e.value for e in at.exception],
+    'loaded': [m for m in {heavy!r} if m in sys.modules and m not in already_loaded]
+}}))
+"""
+
+def measure(app, runs, reruns=5):
+    """Return the parsed results of `runs` fresh-process renders of `app`"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _CHILD.format(app=os.path.abspath(app), heavy=HEAVY_MODULES, reruns=reruns)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark landing page time to first render")
+    parser.add_argument('--app', default='app.py', help="app script to render")
+    parser.add_argument('--runs', type=int, default=5, help="fresh processes to start")
+    args = parser.parse_args(argv)
+
+    results = measure(args.app, args.runs)
+    errors = [e for r in results for e in r['errors']]
+    if errors:
+        print(f"FAIL: the app raised during rendering: {errors[0]}")
+        return 1
+
+    first = np.array([r['first'] for r in results]) * 1000
+    rerun = np.array([r['rerun'] for r in results]) * 1000
+    print(f"{args.app}: {args.runs} cold starts")
+    print(f"{'':>14} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    print(f"{'first render':>14} {np.median(first):>10.1f} {first.min():>8.1f} {first.max():>8.1f}")
+    print(f"{'warm rerun':>14} {np.median(rerun):>10.1f} {rerun.min():>8.1f} {rerun.max():>8.1f}")
+    print(f"heavy modules loaded by the landing page: {', '.join(results[0]['loaded']) or 'none'}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
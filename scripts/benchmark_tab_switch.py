@@ -0,0 +1,86 @@
+"""Compare a full dashboard rerun with the tab fragment that now handles tab switches
+
+    python -m scripts.benchmark_tab_switch
+    python -m scripts.benchmark_tab_switch --switches 20 --storage csv
+
+Registers a user with a profile in a temporary data directory, opens the
+dashboard with Streamlit's AppTest and cycles through the tabs --switches
+times. AppTest always reruns the whole script, so each switch is timed in
+three ways:
+- "full rerun": the AppTest rerun, i.e. what every tab switch cost before
+  the tabs became fragments (including AppTest's own overhead)
+- "page": the dashboard's show(), from the instrumentation spans
+- "fragment": the show_tabs fragment, which is all that a tab switch
+  reruns in a live server now
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TABS = ['📊 Overview', '🥗 Diet Plan', '💪 Exercise Plan', '📈 Progress']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard tab switch latency: full rerun vs fragment")
+    parser.add_argument('--switches', type=int, default=10, help="switches to each tab")
+    parser.add_argument('--storage', default='sqlite', help="storage backend (sqlite or csv)")
+    args = parser.parse_args(argv)
+
+    # Must be set before the app's modules are imported
+    os.environ['HEALTH_MANAGER_INSTRUMENTATION'] = '1'
+    os.environ['HEALTH_MANAGER_STORAGE'] = args.storage
+    from streamlit.testing.v1 import AppTest
+    from utils import data_manager, instrumentation
+
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ['foods.csv', 'exercises.csv']:
+            shutil.copy(os.path.join(REPOSITORY, name), directory)
+        os.chdir(directory)
+        try:
+            data_manager.initialize_data_files()
+            data_manager.create_user('tab_bench', 'tab-bench-password', 'tab_bench@example.com')
+            data_manager.save_user_profile('tab_bench', {
+                'age': 30, 'gender': 'female', 'height_cm': 165, 'weight_kg': 62.0,
+                'activity_level': 'moderate', 'goal': 'weight_loss', 'diet_preference': 'vegetarian',
+                'bmi': 22.8, 'bmr': 1370.0, 'target_calories': 1623.0
+            }, wait=True)
+
+            at = AppTest.from_file(os.path.join(REPOSITORY, 'app.py'), default_timeout=60)
+            at.session_state.page = 'dashboard'
+            at.session_state.user_logged_in = True
+            at.session_state.username = 'tab_bench'
+            at.run()
+            # One pass over every tab first so caches are warm
+            for tab in TABS:
+                next(b for b in at.button if b.label == tab).click().run()
+
+            results = {tab: {'full rerun': [], 'page': [], 'fragment': []} for tab in TABS}
+            for _ in range(args.switches):
+                for tab in TABS:
+                    instrumentation.reset()
+                    start = time.perf_counter()
+                    next(b for b in at.button if b.label == tab).click().run()
+                    results[tab]['full rerun'].append(time.perf_counter() - start)
+                    spans = instrumentation.stats()
+                    results[tab]['page'].append(spans['page.dashboard']['total_ms'] / 1000)
+                    results[tab]['fragment'].append(spans['dashboard.show_tabs']['total_ms'] / 1000)
+                    if at.exception:
+                        print(f"FAIL: {tab}: {at.exception[0].message}")
+                        return 1
+        finally:
+            os.chdir(previous)
+
+    print(f"{args.switches} switches per tab ({args.storage} storage), median ms")
+    print(f"{'tab':<18} {'full rerun':>11} {'page':>8} {'fragment':>9}")
+    for tab, timings in results.items():
+        medians = [np.median(timings[key]) * 1000 for key in ['full rerun', 'page', 'fragment']]
+        print(f"{tab[2:]:<18} {medians[0]:>11.1f} {medians[1]:>8.1f} {medians[2]:>9.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Build the columnar (memory-mapped .npy) versions of the catalog CSVs
+
+    python -m scripts.build_catalog
+    python -m scripts.build_catalog --catalogs foods.csv
+
+For every catalog, writes <name>.columnar/ next to the CSV. Numeric
+columns are stored as raw arrays, category/diet_type/goal_suitability
+(and the exercise equivalents) as dictionary codes, and text as UTF-8
+blobs. The name column also gets a prefix and trigram search index. The
+build is tagged with the CSV's mtime and size. The app opens it instead
+of parsing the CSV for as long as the CSV is unchanged. Rerun this after
+editing a catalog.
+"""
+import argparse
+import os
+import sys
+import time
+from utils.catalog import FOODS_PATH, EXERCISES_PATH, build_columnar, columnar_path
+
+def _directory_size(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build columnar catalog files")
+    parser.add_argument('--catalogs', nargs='+', default=[FOODS_PATH, EXERCISES_PATH], help="catalog CSVs to build")
+    args = parser.parse_args(argv)
+
+    for path in args.catalogs:
+        start = time.perf_counter()
+        build_columnar(path)
+        elapsed = time.perf_counter() - start
+        directory = columnar_path(path)
+        print(f"{path} -> {directory}: {_directory_size(directory) / 2 ** 20:.1f} MB in {elapsed:.2f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Check that the batch health calculations match the scalar functions exactly
+
+    python -m scripts.check_batch_parity
+    python -m scripts.check_batch_parity --rows 300000 --seed 1
+    python -m scripts.check_batch_parity --rows 1000000 --time
+
+Draws --rows random profiles and runs every *_batch function next to its
+scalar counterpart in utils.health_calculator. Half of the weights and
+heights are arbitrary Python floats, and half are rounded to one decimal
+like form inputs, which lands many results on a .5 rounding boundary.
+Genders include other capitalizations, and some activity levels and goals
+are unknown, so the defaults are covered too. Exits with status 1 if any
+element differs from the scalar result.
+
+--time also times calculate_health_metrics_batch against a plain Python
+loop calling the scalar functions for every row (alternating, the median
+of --repeat runs each), and exits with status 1 if the batch path is less than
+--min-speedup times faster.
+"""
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+from utils.health_calculator import (
+    calculate_bmi, get_bmi_category, calculate_bmr, calculate_target_calories, get_macronutrient_split,
+    calculate_bmi_batch, get_bmi_category_codes, calculate_bmr_batch, calculate_target_calories_batch,
+    get_macronutrient_split_batch, calculate_health_metrics_batch,
+    ACTIVITY_MULTIPLIERS, DEFAULT_ACTIVITY_MULTIPLIER, GOAL_CALORIE_ADJUSTMENTS, BMI_CATEGORIES
+)
+
+GENDERS = ['male', 'female', 'Male', 'FEMALE', 'other']
+ACTIVITY_LEVELS = list(ACTIVITY_MULTIPLIERS) + ['unknown']
+GOALS = list(GOAL_CALORIE_ADJUSTMENTS) + ['unknown']
+
+def random_profiles(rows, rng):
+    """Columns of random inputs, as Python-compatible NumPy arrays"""
+    weights = rng.uniform(30, 200, rows)
+    heights = rng.uniform(120, 220, rows)
+    form_rows = rng.random(rows) < 0.5
+    weights[form_rows] = np.round(weights[form_rows], 1)
+    heights[form_rows] = np.round(heights[form_rows])
+    return {
+        'weight_kg': weights,
+        'height_cm': heights,
+        'age': rng.integers(10, 100, rows),
+        'gender': rng.choice(GENDERS, rows),
+        'activity_level': rng.choice(ACTIVITY_LEVELS, rows),
+        'goal': rng.choice(GOALS, rows)
+    }
+
+def compare(name, batch, scalar):
+    """Number of elements where `batch` differs from the list of scalar results"""
+    mismatches = int((np.asarray(batch) != np.asarray(scalar)).sum())
+    print(f"{name:<28} {'OK' if not mismatches else f'{mismatches} mismatches'}")
+    return mismatches
+
+def scalar_metrics(weights, heights, ages, genders, activity_levels, goals):
+    """Everything calculate_health_metrics_batch computes, one row at a time with the scalar functions"""
+    results = []
+    for weight, height, age, gender, activity_level, goal in zip(weights, heights, ages, genders, activity_levels, goals):
+        bmi = calculate_bmi(weight, height)
+        bmr = calculate_bmr(weight, height, age, gender)
+        results.append((
+            bmi, get_bmi_category(bmi), bmr,
+            bmr * ACTIVITY_MULTIPLIERS.get(activity_level, DEFAULT_ACTIVITY_MULTIPLIER),
+            get_macronutrient_split(goal, calculate_target_calories(bmr, activity_level, goal))
+        ))
+    return results
+
+def _seconds(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def time_batch(p, repeat):
+    """Median (batch seconds, scalar loop seconds) for the same profiles
+
+    The two are timed alternately, so a busy machine slows both alike.
+    """
+    profiles = pd.DataFrame(p)
+    columns = [profiles[c].tolist() for c in ['weight_kg', 'height_cm', 'age', 'gender', 'activity_level', 'goal']]
+    timings = np.array([
+        (_seconds(lambda: calculate_health_metrics_batch(profiles)), _seconds(lambda: scalar_metrics(*columns)))
+        for _ in range(repeat)
+    ])
+    return np.median(timings[:, 0]), np.median(timings[:, 1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch vs scalar health calculation parity check")
+    parser.add_argument('--rows', type=int, default=300000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time', action='store_true', help="also time the batch path against a scalar loop")
+    parser.add_argument('--repeat', type=int, default=3, help="timing runs (the median is reported)")
+    parser.add_argument('--min-speedup', type=float, default=50)
+    args = parser.parse_args(argv)
+
+    p = random_profiles(args.rows, np.random.default_rng(args.seed))
+    rows = range(args.rows)
+    weights, heights, ages = p['weight_kg'].tolist(), p['height_cm'].tolist(), p['age'].tolist()
+    start = time.perf_counter()
+
+    bmi = calculate_bmi_batch(p['weight_kg'], p['height_cm'])
+    bmr = calculate_bmr_batch(p['weight_kg'], p['height_cm'], p['age'], p['gender'])
+    target_calories = calculate_target_calories_batch(bmr, p['activity_level'], p['goal'])
+    macros = get_macronutrient_split_batch(p['goal'], target_calories)
+
+    scalar_bmi = [calculate_bmi(weights[i], heights[i]) for i in rows]
+    scalar_bmr = [calculate_bmr(weights[i], heights[i], ages[i], str(p['gender'][i])) for i in rows]
+    scalar_target = [
+        calculate_target_calories(scalar_bmr[i], str(p['activity_level'][i]), str(p['goal'][i])) for i in rows
+    ]
+    scalar_macros = [get_macronutrient_split(str(p['goal'][i]), scalar_target[i]) for i in rows]
+    labels = np.array([label for label, _ in BMI_CATEGORIES])
+
+    mismatches = sum([
+        compare('calculate_bmi', bmi, scalar_bmi),
+        compare('get_bmi_category', labels[get_bmi_category_codes(bmi)], [get_bmi_category(b)[0] for b in scalar_bmi]),
+        compare('calculate_bmr', bmr, scalar_bmr),
+        compare('calculate_target_calories', target_calories, scalar_target),
+        *(compare(f'macros[{name}]', macros[name], [m[name] for m in scalar_macros]) for name in ['protein', 'carbs', 'fat'])
+    ])
+    print(f"{args.rows} profiles checked in {time.perf_counter() - start:.1f}s")
+    if mismatches:
+        print(f"FAIL: {mismatches} batch results differ from the scalar functions")
+        return 1
+    print("OK: every batch result is identical to the scalar result")
+
+    if args.time:
+        batch, scalar = time_batch(p, args.repeat)
+        speedup = scalar / batch
+        print(f"calculate_health_metrics_batch: {batch:.3f}s, scalar loop: {scalar:.2f}s ({speedup:.0f}x)")
+        if speedup < args.min_speedup:
+            print(f"FAIL: the batch path is less than {args.min_speedup:g}x faster")
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Check that the columnar search index returns what the frame scan returns
+
+    python -m scripts.check_catalog_search
+    python -m scripts.check_catalog_search --foods 50000 --queries 1000
+
+Writes a synthetic foods catalog of --foods rows (plus the real foods.csv)
+into a temporary directory and builds its columnar copy. Every query then
+goes to Catalog.search() twice: once through the prefix/trigram index and
+once through the vectorized scan used when there is no columnar build.
+Queries are random prefixes and substrings of food names, with other
+capitalizations, surrounding whitespace and misses mixed in, at several
+limits. Exits with status 1 if any query gets different positions.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from utils.catalog import Catalog, build_columnar, get_catalog
+from scripts.benchmark_catalog_memory import write_catalog
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIMITS = [1, 5, 20, 100]
+
+def random_queries(names, count, rng):
+    """Prefixes, substrings, case and whitespace variants and misses of `names`"""
+    queries = ['', ' ', 'zzzzzz', 'qx', '#', 'a', 'ch']
+    for name in rng.choice(names, count):
+        start = int(rng.integers(0, len(name)))
+        length = int(rng.integers(1, 9))
+        query = name[:length] if rng.random() < 0.5 else name[start:start + length]
+        variant = rng.integers(0, 4)
+        if variant == 1:
+            query = query.upper()
+        elif variant == 2:
+            query = f'  {query} '
+        elif variant == 3:
+            query = query + 'qz'
+        queries.append(query)
+    return queries
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar index vs scan search parity check")
+    parser.add_argument('--foods', type=int, default=10000, help="synthetic catalog rows")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_catalog(directory, args.foods, args.seed)
+        # The real names too, so short and multi-word names are covered
+        foods = pd.concat([pd.read_csv(os.path.join(directory, 'foods.csv')), pd.read_csv(os.path.join(REPOSITORY, 'foods.csv'))])
+        path = os.path.join(directory, 'foods.csv')
+        foods.to_csv(path, index=False)
+        build_columnar(path)
+
+        indexed = get_catalog(path)
+        if indexed.table is None or indexed.table.text_index('food_name') is None:
+            print("FAIL: the columnar build has no food_name index")
+            return 1
+        scanned = Catalog(path, pd.read_csv(path), indexed.signature)
+
+        names = foods['food_name'].dropna().tolist()
+        queries = random_queries(names, args.queries, np.random.default_rng(args.seed))
+        start = time.perf_counter()
+        mismatches = []
+        for query in queries:
+            for limit in LIMITS:
+                expected = scanned.search('food_name', query, limit)
+                found = indexed.search('food_name', query, limit)
+                if not np.array_equal(np.asarray(found, dtype=np.int64), np.asarray(expected, dtype=np.int64)):
+                    mismatches.append((query, limit))
+        elapsed = time.perf_counter() - start
+
+    print(f"{len(queries)} queries x {len(LIMITS)} limits over {len(foods)} foods in {elapsed:.1f}s")
+    if mismatches:
+        print(f"FAIL: {len(mismatches)} searches differ, e.g. {mismatches[:5]}")
+        return 1
+    print("OK: the index and the scan return the same positions for every search")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Headless load test: many simulated users clicking through the app at once
+
+    python -m scripts.load_test
+    python -m scripts.load_test --processes 2 --threads 8 --sessions 5 --storage csv
+
+Starts --processes worker processes with --threads threads each. Every
+thread runs --sessions user sessions one after another, each through
+Streamlit's AppTest harness:
+landing -> sign up -> log in -> submit the assessment -> dashboard ->
+every dashboard tab.
+
+Everything runs against a fresh data directory in a temporary folder,
+using the --storage backend. Each worker process stands in for one
+server process, and its threads are that server's concurrent sessions.
+AppTest keeps its runtime in a process-wide global, so the threads of a
+worker take turns rerunning, and their sessions interleave one rerun at
+a time. Reruns overlap for real only across processes.
+
+The report gives:
+- sessions/sec
+- rerun latency percentiles per step and overall
+- lock contention from the instrumentation spans: time spent waiting for
+  the storage file locks and the catalog lock, and the data_manager calls
+  (SQLite busy waits show up there, inside the storage calls)
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPOSITORY, 'app.py')
+PASSWORD = 'load-test-password'
+DASHBOARD_TABS = ['📊 Overview', '🥗 Diet Plan', '💪 Exercise Plan', '📈 Progress']
+# Spans reported in the contention table (prefix match)
+CONTENTION_SPANS = ('storage.', 'catalog.lock_wait', 'data_manager.')
+
+# AppTest installs and clears a global Runtime around every run
+_apptest_lock = threading.Lock()
+
+def _button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+def _text_input(at, label):
+    return next(text_input for text_input in at.text_input if text_input.label == label)
+
+def run_session(username, rng, timeout):
+    """Click through one user's session; returns [(step, rerun seconds)]"""
+    from streamlit.testing.v1 import AppTest
+
+    timings = []
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def rerun(step, action=None):
+        with _apptest_lock:
+            start = time.perf_counter()
+            (action() if action is not None else at).run()
+            timings.append((step, time.perf_counter() - start))
+        if at.exception:
+            raise RuntimeError(f"{step}: {at.exception[0].message}")
+
+    rerun('landing')
+    rerun('open_auth', lambda: _button(at, "🚀 Get Started - Login/Sign Up").click())
+
+    # The signup form's inputs come after the login form's
+    at.text_input[2].input(username)
+    _text_input(at, "Email").input(f'{username}@example.com')
+    at.text_input[4].input(PASSWORD)
+    _text_input(at, "Confirm Password").input(PASSWORD)
+    at.checkbox[0].check()
+    rerun('signup', lambda: _button(at, "📝 Create Account").click())
+
+    _text_input(at, "Username or Email").input(username)
+    at.text_input[1].input(PASSWORD)
+    rerun('login', lambda: _button(at, "🔓 Login").click())
+    if at.session_state.page != 'assessment':
+        raise RuntimeError(f"login did not reach the assessment: {[e.value for e in at.error]}")
+
+    numbers = {number.label: number for number in at.number_input}
+    numbers['Age'].set_value(int(rng.integers(18, 70)))
+    numbers['Height (cm)'].set_value(int(rng.integers(150, 200)))
+    numbers['Weight (kg)'].set_value(float(rng.integers(500, 1200)) / 10)
+    selects = {select.label: select for select in at.selectbox}
+    selects['Gender'].select(str(rng.choice(['Male', 'Female'])))
+    selects['Activity Level'].select(str(rng.choice(['sedentary', 'light', 'moderate', 'active', 'very_active'])))
+    selects['Primary Goal'].select(str(rng.choice(['weight_loss', 'weight_gain', 'muscle_building', 'maintenance'])))
+    selects['Diet Preference'].select(str(rng.choice(['vegetarian', 'non_vegetarian', 'vegan'])))
+    rerun('assessment', lambda: _button(at, "📊 Calculate My Health Profile").click())
+    rerun('open_dashboard', lambda: _button(at, "🎯 View Full Dashboard").click())
+
+    for tab in DASHBOARD_TABS:
+        rerun(f'tab {tab[2:]}', lambda: _button(at, tab).click())
+    return timings
+
+def _worker(directory, process_id, threads, sessions, timeout, start_barrier, results):
+    os.chdir(directory)
+    from utils import instrumentation
+
+    def run_thread(thread_id):
+        rng = np.random.default_rng([process_id, thread_id])
+        timings, errors, durations = [], [], []
+        for i in range(sessions):
+            start = time.perf_counter()
+            try:
+                timings.extend(run_session(f'load_p{process_id}_t{thread_id}_s{i}', rng, timeout))
+                durations.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(''.join(traceback.format_exception_only(type(e), e)).strip())
+        return timings, errors, durations
+
+    try:
+        start_barrier.wait()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outcomes = list(pool.map(run_thread, range(threads)))
+        results.put((
+            [t for timings, _, _ in outcomes for t in timings],
+            [e for _, errors, _ in outcomes for e in errors],
+            [d for _, _, durations in outcomes for d in durations],
+            instrumentation.snapshot()
+        ))
+    except Exception as e:
+        # Report instead of dying so the parent never waits forever
+        results.put(e)
+
+def prepare_directory(directory):
+    """Copy the catalogs into a fresh data directory (user data starts empty)"""
+    for name in ['foods.csv', 'exercises.csv']:
+        shutil.copy(os.path.join(REPOSITORY, name), directory)
+
+def print_latencies(timings):
+    steps = {}
+    for step, seconds in timings:
+        steps.setdefault(step, []).append(seconds)
+    steps['all reruns'] = [seconds for _, seconds in timings]
+    print(f"\n{'rerun':<22} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for step, values in steps.items():
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+        print(f"{step:<22} {len(values):>6} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+def print_contention(histograms):
+    print(f"\n{'span':<40} {'count':>7} {'total ms':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name in sorted(histograms, key=lambda name: -histograms[name].total):
+        if name.startswith(CONTENTION_SPANS):
+            s = histograms[name].summary()
+            print(f"{name:<40} {s['count']:>7} {s['total_ms']:>10.1f} {s['p50_ms']:>8.2f} {s['p99_ms']:>8.2f} {s['max_ms']:>8.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent app sessions with AppTest")
+    parser.add_argument('--processes', type=int, default=4, help="worker processes (server processes)")
+    parser.add_argument('--threads', type=int, default=2, help="concurrent sessions per process")
+    parser.add_argument('--sessions', type=int, default=3, help="sessions run by each thread")
+    parser.add_argument('--storage', default='sqlite', help="storage backend (sqlite or csv)")
+    parser.add_argument('--timeout', type=float, default=60, help="seconds allowed per rerun")
+    args = parser.parse_args(argv)
+
+    # Inherited by the spawned workers before they import the app
+    os.environ['HEALTH_MANAGER_STORAGE'] = args.storage
+    os.environ['HEALTH_MANAGER_INSTRUMENTATION'] = '1'
+
+    from utils.instrumentation import Histogram
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        prepare_directory(directory)
+        start_barrier = context.Barrier(args.processes + 1)
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=_worker,
+                args=(directory, p, args.threads, args.sessions, args.timeout, start_barrier, results)
+            )
+            for p in range(args.processes)
+        ]
+        for worker in workers:
+            worker.start()
+        # Start the clock once every worker has imported its modules
+        start_barrier.wait()
+        start = time.perf_counter()
+        outcomes = [results.get() for _ in workers]
+        elapsed = time.perf_counter() - start
+        for worker in workers:
+            worker.join()
+
+    failures = [o for o in outcomes if isinstance(o, Exception)]
+    if failures:
+        print(f"FAIL: {len(failures)} worker process(es) raised, e.g. {failures[0]!r}")
+        return 1
+
+    timings = [t for outcome in outcomes for t in outcome[0]]
+    errors = [e for outcome in outcomes for e in outcome[1]]
+    completed = sum(len(outcome[2]) for outcome in outcomes)
+    histograms = {}
+    for outcome in outcomes:
+        for name, histogram in outcome[3].items():
+            histograms.setdefault(name, Histogram()).merge(histogram)
+
+    total = args.processes * args.threads * args.sessions
+    print(f"{completed}/{total} sessions completed by {args.processes} process(es) x {args.threads} thread(s) "
+          f"in {elapsed:.1f}s ({args.storage} storage): {completed / elapsed:.2f} sessions/s")
+    if timings:
+        print_latencies(timings)
+    print_contention(histograms)
+    if errors:
+        print(f"\n{len(errors)} session(s) failed, e.g. {errors[0]}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Precompute the one-day meal plan of every stored profile
+
+Meant to run overnight from the repository root:
+
+    python -m scripts.precompute_meal_plans
+    python -m scripts.precompute_meal_plans --storage csv --workers 4 --output meal_plans.csv
+
+A plan depends only on the diet preference, goal and target calories, so
+each distinct combination is solved once and shared by every profile
+that has it. Profiles are streamed in chunks. The output CSV has one row
+per planned food (username, meal, food_name, grams and its nutrients) and
+replaces the previous file atomically when the run completes.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from utils.storage import create_storage
+from utils.meal_planner import generate_meal_plan
+
+PLAN_COLUMNS = ['username', 'meal', 'food_name', 'grams', 'calories', 'protein', 'carbs', 'fat']
+
+def _solve(key):
+    diet_preference, goal, target_calories = key
+    plan = generate_meal_plan(diet_preference, goal, target_calories)
+    return None if plan is None else plan['foods']
+
+def plan_chunk(chunk, plans, pool=None):
+    """Meal-plan rows for a chunk of profiles, solving only combinations not in `plans`"""
+    keys = list(zip(chunk['diet_preference'], chunk['goal'], chunk['target_calories'].astype(float)))
+    new_keys = list(dict.fromkeys(k for k in keys if k not in plans))
+    solved = pool.map(_solve, new_keys, chunksize=16) if pool else map(_solve, new_keys)
+    plans.update(zip(new_keys, solved))
+
+    # Expand each distinct plan to every profile that shares it with one merge
+    chunk_keys = list(dict.fromkeys(keys))
+    frames = [plans[k].assign(plan=i) for i, k in enumerate(chunk_keys) if plans[k] is not None]
+    if not frames:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+    plan_ids = {k: i for i, k in enumerate(chunk_keys)}
+    owners = pd.DataFrame({'username': chunk['username'].to_numpy(), 'plan': [plan_ids[k] for k in keys]})
+    return owners.merge(pd.concat(frames, ignore_index=True), on='plan', sort=False)[PLAN_COLUMNS]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute meal plans for every stored profile")
+    parser.add_argument('--storage', choices=['sqlite', 'csv'], help="storage backend (default: HEALTH_MANAGER_STORAGE or sqlite)")
+    parser.add_argument('--output', default='meal_plans.csv', help="CSV file to write")
+    parser.add_argument('--chunksize', type=int, default=10000, help="profiles processed per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="processes solving plans in parallel")
+    args = parser.parse_args(argv)
+
+    storage = create_storage(args.storage)
+    storage.initialize()
+
+    start = time.perf_counter()
+    plans = {}
+    profiles = 0
+    missing = 0
+    directory = os.path.dirname(os.path.abspath(args.output))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        pool = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+        try:
+            with os.fdopen(fd, 'w', newline='') as tmp:
+                header = True
+                for chunk in storage.iter_profiles(args.chunksize):
+                    rows = plan_chunk(chunk, plans, pool)
+                    rows.to_csv(tmp, index=False, header=header)
+                    header = False
+                    profiles += len(chunk)
+                    missing += len(chunk) - rows['username'].nunique()
+                if header:
+                    pd.DataFrame(columns=PLAN_COLUMNS).to_csv(tmp, index=False)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+        finally:
+            if pool:
+                pool.shutdown()
+        os.replace(tmp_path, args.output)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    elapsed = time.perf_counter() - start
+
+    print(f"Planned {profiles - missing} of {profiles} profiles ({len(plans)} distinct plans solved) into {args.output}")
+    if missing:
+        print(f"  {missing} profiles have no plan (no foods match their diet preference)")
+    rate = profiles / elapsed if elapsed > 0 else float('inf')
+    print(f"{elapsed:.2f}s ({rate:,.0f} profiles/sec)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
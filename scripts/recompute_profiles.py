@@ -0,0 +1,89 @@
+"""Recompute the derived columns (bmi, bmr, target_calories) of every stored profile
+
+Run from the repository root after changing the formulas or constants in
+utils/health_calculator.py:
+
+    python -m scripts.recompute_profiles --dry-run
+    python -m scripts.recompute_profiles --storage csv --chunksize 200000
+
+Profiles are streamed in chunks, so memory use is bounded by --chunksize
+regardless of how many profiles are stored. The rewritten store replaces
+the old one atomically.
+"""
+import argparse
+import sys
+import time
+import numpy as np
+from utils.storage import create_storage
+from utils.health_calculator import calculate_bmi_batch, calculate_bmr_batch, calculate_target_calories_batch
+
+DERIVED_COLUMNS = ['bmi', 'bmr', 'target_calories']
+
+def recompute_chunk(chunk):
+    """Return a copy of a profile chunk with its derived columns recomputed"""
+    out = chunk.copy()
+    out['bmi'] = calculate_bmi_batch(chunk['weight_kg'], chunk['height_cm'])
+    out['bmr'] = calculate_bmr_batch(chunk['weight_kg'], chunk['height_cm'], chunk['age'], chunk['gender'])
+    out['target_calories'] = calculate_target_calories_batch(out['bmr'], chunk['activity_level'], chunk['goal'])
+    return out
+
+def changed_mask(chunk, recomputed, column):
+    """Boolean mask of rows whose derived `column` would change (NaN == NaN)"""
+    old = chunk[column].to_numpy(dtype=float)
+    new = recomputed[column].to_numpy(dtype=float)
+    return (old != new) & ~(np.isnan(old) & np.isnan(new))
+
+def run_dry_run(storage, chunksize, show):
+    """Report what a recompute would change without writing anything"""
+    rows = 0
+    changed_rows = 0
+    changed_by_column = dict.fromkeys(DERIVED_COLUMNS, 0)
+
+    for chunk in storage.iter_profiles(chunksize):
+        recomputed = recompute_chunk(chunk)
+        masks = {column: changed_mask(chunk, recomputed, column) for column in DERIVED_COLUMNS}
+        any_changed = np.logical_or.reduce(list(masks.values()))
+
+        for column, mask in masks.items():
+            changed_by_column[column] += int(mask.sum())
+        for i in np.flatnonzero(any_changed)[:max(show, 0)]:
+            changes = ', '.join(
+                f"{column} {chunk[column].iloc[i]:g} -> {recomputed[column].iloc[i]:g}"
+                for column in DERIVED_COLUMNS if masks[column][i]
+            )
+            print(f"  {chunk['username'].iloc[i]}: {changes}")
+        show -= int(any_changed.sum())
+
+        rows += len(chunk)
+        changed_rows += int(any_changed.sum())
+
+    print(f"{changed_rows} of {rows} profiles would change")
+    for column, count in changed_by_column.items():
+        print(f"  {column}: {count}")
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute derived health metrics for every stored profile")
+    parser.add_argument('--storage', choices=['sqlite', 'csv'], help="storage backend (default: HEALTH_MANAGER_STORAGE or sqlite)")
+    parser.add_argument('--chunksize', type=int, default=100000, help="profiles processed per chunk")
+    parser.add_argument('--dry-run', action='store_true', help="only report the changes that would be made")
+    parser.add_argument('--show', type=int, default=20, help="number of individual changes to print in --dry-run mode")
+    args = parser.parse_args(argv)
+
+    storage = create_storage(args.storage)
+    storage.initialize()
+
+    start = time.perf_counter()
+    if args.dry_run:
+        rows = run_dry_run(storage, args.chunksize, args.show)
+    else:
+        rows = storage.rewrite_profiles(recompute_chunk, args.chunksize)
+        print(f"Recomputed {rows} profiles")
+    elapsed = time.perf_counter() - start
+
+    rate = rows / elapsed if elapsed > 0 else float('inf')
+    print(f"{elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Multi-process stress test for the CSV profile store
+
+    python -m scripts.stress_profile_writes
+    python -m scripts.stress_profile_writes --processes 8 --threads 8 --saves 25
+
+Starts several processes, each with several threads, that all save profiles
+into one shared user_profiles.csv in a temporary directory. Every thread
+writes its own usernames, and half of the saves are updates to profiles
+saved earlier. When all workers finish, the file must contain every
+username exactly once, with its latest values. Exits with status 1 if any
+row was lost, duplicated or stale.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process, Queue
+import pandas as pd
+from utils.storage import CSVStorage
+
+def _profile(username, revision):
+    return {
+        'username': username, 'age': 30, 'gender': 'female', 'height_cm': 165,
+        'weight_kg': 60.0 + revision, 'activity_level': 'moderate', 'goal': 'maintenance',
+        'diet_preference': 'vegetarian', 'bmi': 22.0, 'bmr': 1350.0,
+        'target_calories': 2090.0, 'created_date': '2025-01-01 00:00:00'
+    }
+
+def _worker(directory, process_id, threads, saves, results):
+    storage = CSVStorage(
+        users_path=os.path.join(directory, 'users.csv'),
+        profiles_path=os.path.join(directory, 'user_profiles.csv')
+    )
+
+    def run_thread(thread_id):
+        for i in range(saves):
+            # Every other save updates the previous profile instead of adding one
+            username = f"p{process_id}_t{thread_id}_u{i // 2}"
+            storage.upsert_profile(_profile(username, i))
+
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(run_thread, range(threads)))
+        results.put(storage._profile_writer.flushes)
+    except Exception as e:
+        # Report instead of dying so the parent never waits forever
+        results.put(e)
+
+def expected_profiles(processes, threads, saves):
+    """username -> weight_kg of the last save each username received"""
+    expected = {}
+    for p in range(processes):
+        for t in range(threads):
+            for i in range(saves):
+                expected[f"p{p}_t{t}_u{i // 2}"] = 60.0 + i
+    return expected
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent CSV profile write stress test")
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--saves', type=int, default=20, help="saves per thread")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        CSVStorage(
+            users_path=os.path.join(directory, 'users.csv'),
+            profiles_path=os.path.join(directory, 'user_profiles.csv')
+        ).initialize()
+
+        results = Queue()
+        workers = [
+            Process(target=_worker, args=(directory, p, args.threads, args.saves, results))
+            for p in range(args.processes)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        errors = [o for o in outcomes if isinstance(o, Exception)]
+        if errors:
+            print(f"FAIL: {len(errors)} worker process(es) raised, e.g. {errors[0]!r}")
+            return 1
+        flushes = sum(outcomes)
+
+        stored = pd.read_csv(os.path.join(directory, 'user_profiles.csv'))
+
+    expected = expected_profiles(args.processes, args.threads, args.saves)
+    saves = args.processes * args.threads * args.saves
+    print(f"{saves} saves from {args.processes} processes x {args.threads} threads in {elapsed:.2f}s")
+    print(f"{flushes} file rewrites ({saves / max(flushes, 1):.1f} saves per rewrite)")
+
+    duplicated = stored['username'][stored['username'].duplicated()].unique()
+    missing = set(expected) - set(stored['username'])
+    latest = dict(zip(stored['username'], stored['weight_kg']))
+    stale = [u for u, weight in expected.items() if u in latest and latest[u] != weight]
+
+    if missing or len(duplicated) or stale:
+        print(f"FAIL: {len(missing)} missing, {len(duplicated)} duplicated, {len(stale)} stale profiles")
+        return 1
+    print(f"OK: all {len(expected)} profiles present exactly once with their latest values")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import html
+from functools import lru_cache
+import pandas as pd
+from utils.catalog import get_foods_catalog, get_exercises_catalog
+from utils.data_manager import get_food_recommendations, get_exercise_recommendations
+from utils.instrumentation import timed
+
+INTENSITY_COLORS = {'Low': '#4CAF50', 'Medium': '#FF9800', 'High': '#F44336'}
+
+# Whole grids are sent as one markdown element: a CSS grid of equal columns
+# (like st.columns) instead of one columns block plus one element per card
+GRID_TEMPLATE = '<div style="display: grid; grid-template-columns: {columns}; gap: 1rem; align-items: start;">{cards}</div>'
+
+# Same replacements as html.escape, applied to whole columns
+HTML_ESCAPES = [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;')]
+
+def _text(series):
+    """HTML-escaped string form of a column (missing values read "None")"""
+    text = series.where(series.notna(), 'None').astype(str)
+    for char, entity in HTML_ESCAPES:
+        text = text.str.replace(char, entity, regex=False)
+    return text
+
+def grid(cards, columns):
+    """Lay out card HTML strings in `columns` equal columns (or a grid-template-columns value)"""
+    if isinstance(columns, int):
+        columns = f'repeat({columns}, minmax(0, 1fr))'
+    return GRID_TEMPLATE.format(columns=columns, cards=''.join(cards))
+
+def food_cards(foods):
+    """One feature card per food, built column-wise"""
+    return (
+        '<div class="feature-card"><h5>' + _text(foods['food_name']) + '</h5>'
+        '<p><strong>Category:</strong> ' + _text(foods['category']) + '</p>'
+        '<p><strong>Calories:</strong> ' + _text(foods['calories_per_100g']) + '/100g</p>'
+        '<p><strong>Protein:</strong> ' + _text(foods['protein']) + 'g</p>'
+        '<p><strong>Carbs:</strong> ' + _text(foods['carbs']) + 'g</p>'
+        '<p><strong>Fat:</strong> ' + _text(foods['fat']) + 'g</p></div>'
+    )
+
+def exercise_rows(exercises):
+    """Per exercise, a details card and a duration card (laid out 2:1)"""
+    colors = exercises['intensity'].map(INTENSITY_COLORS).fillna('#666')
+    return (
+        '<div style="background: #F9F9F9; padding: 1rem; border-radius: 8px; margin: 0.5rem 0;">'
+        '<h6>' + _text(exercises['exercise_name']) + '</h6>'
+        '<p><strong>Target:</strong> ' + _text(exercises['target_muscle']) + '</p>'
+        '<p><strong>Intensity:</strong> <span style="color: ' + colors + ';">' + _text(exercises['intensity']) + '</span></p>'
+        '<p><strong>Equipment:</strong> ' + _text(exercises['equipment_needed']) + '</p></div>'
+        '<div class="metric-card"><h6>Duration</h6><h4>' + _text(exercises['duration_minutes']) + ' min</h4>'
+        '<p>' + _text(exercises['calories_per_hour']) + ' cal/hr</p></div>'
+    )
+
+def exercise_sections(exercises):
+    """Exercises grouped under a heading per category, in order of first appearance"""
+    rows = exercise_rows(exercises)
+    return ''.join(
+        f'<h5>{html.escape(str(category).title())} Exercises</h5>' + grid(rows.loc[group.index], '2fr 1fr')
+        for category, group in exercises.groupby('category', sort=False)
+    )
+
+def meal_plan_grid(plan_foods):
+    """One card per meal listing its portions"""
+    portions = (
+        '<p><strong>' + _text(plan_foods['food_name']) + '</strong> ' + plan_foods['grams'].map('{:g}'.format) + 'g<br>'
+        + plan_foods['calories'].map('{:.0f}'.format) + ' cal · ' + plan_foods['protein'].map('{:.0f}'.format) + 'g protein</p>'
+    )
+    meals = portions.groupby(plan_foods['meal'], sort=False).agg(''.join)
+    cards = '<div class="feature-card"><h5>' + _text(meals.index.to_series()) + '</h5>' + meals + '</div>'
+    return grid(cards, len(cards))
+
+def schedule_grid(sessions, days):
+    """One card per day with its exercises, or 'Rest day'"""
+    entries = (
+        '<p><strong>' + _text(sessions['exercise_name']) + '</strong><br>'
+        + _text(sessions['minutes']) + ' min · ' + _text(sessions['target_muscle']) + '</p>'
+    )
+    bodies = entries.groupby(sessions['day'], sort=False).agg(''.join).reindex(days).fillna('<p>Rest day</p>')
+    cards = '<div class="metric-card"><h6>' + _text(pd.Series(days, index=days)) + '</h6>' + bodies + '</div>'
+    return grid(cards, len(days))
+
+@lru_cache(maxsize=256)
+def _food_grid(diet_preference, goal, limit, catalog_signature):
+    foods = get_food_recommendations(diet_preference, goal, limit)
+    return grid(food_cards(foods), 3) if not foods.empty else None
+
+@lru_cache(maxsize=64)
+def _exercise_grid(goal, limit, catalog_signature):
+    exercises = get_exercise_recommendations(goal, limit)
+    return exercise_sections(exercises) if not exercises.empty else None
+
+@timed()
+def food_recommendations_html(diet_preference, goal, limit=12):
+    """Card grid of get_food_recommendations(), or None if there are none
+
+    Cached per (diet_preference, goal, limit) until foods.csv changes.
+    """
+    return _food_grid(diet_preference, goal, limit, get_foods_catalog().signature)
+
+@timed()
+def exercise_recommendations_html(goal, limit=12):
+    """Category sections of get_exercise_recommendations() cards, or None if there are none
+
+    Cached per (goal, limit) until exercises.csv changes.
+    """
+    return _exercise_grid(goal, limit, get_exercises_catalog().signature)
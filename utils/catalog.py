@@ -0,0 +1,168 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from utils.columnar import ColumnarTable, read_manifest, write_table
+from utils.instrumentation import span, timed
+from utils.storage import file_lock, file_signature
+
+FOODS_PATH = 'foods.csv'
+EXERCISES_PATH = 'exercises.csv'
+
+# Build the columnar copy on first use and open it memory-mapped ("0" parses the CSV per process)
+COLUMNAR_CATALOGS = os.environ.get('HEALTH_MANAGER_COLUMNAR_CATALOG', '1') != '0'
+
+# Columnar layout per catalog: dictionary-encoded columns and searchable text columns
+CATALOG_LAYOUTS = {
+    FOODS_PATH: {'categorical': ['category', 'diet_type', 'goal_suitability'], 'search': ['food_name']},
+    EXERCISES_PATH: {
+        'categorical': ['category', 'intensity', 'target_muscle', 'equipment_needed', 'goal_suitability'],
+        'search': ['exercise_name']
+    }
+}
+
+class Catalog:
+    """A reference table (foods or exercises) shared by every session
+
+    The frame is loaded once per process and reused until the file's
+    mtime or size changes. Callers get copies or shallow views and must
+    never modify the cached frame in place.
+
+    When backed by a columnar build, the frame is a zero-copy view of the
+    mapped files (categorical columns have the 'category' dtype) shared
+    with every other process, and take() decodes just the requested rows.
+    """
+
+    def __init__(self, path, frame, signature, table=None):
+        self.path = path
+        self.signature = signature
+        self.table = table  # ColumnarTable when loaded from the columnar build
+        self._frame = frame
+        self._indexes = {}
+
+    def __len__(self):
+        return len(self._frame)
+
+    def view(self):
+        """Return a shallow, read-only view of the whole table"""
+        return self._frame.copy(deep=False)
+
+    def index(self, name, builder):
+        """Return a derived index built from this catalog's frame, building it once
+
+        Indexes live on the Catalog instance, so they are rebuilt only when
+        this particular file changes and is reloaded.
+        """
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes.setdefault(name, builder(self._frame))
+        return index
+
+    def take(self, positions):
+        """Return a copy of the rows at the given positions (original index kept)"""
+        if self.table is not None:
+            return self.table.frame(np.asarray(positions, dtype=np.int64))
+        return self._frame.iloc[positions].copy()
+
+    def search(self, column, query, limit=20):
+        """Positions of rows whose `column` starts with, then contains, `query` (case-insensitive)
+
+        Uses the columnar build's prefix/trigram index when there is one,
+        and a vectorized scan of the frame otherwise.
+        """
+        index = self.table.text_index(column) if self.table is not None else None
+        if index is not None:
+            return index.search(query, limit)
+
+        query = query.strip().lower()
+        if not query:
+            return np.array([], dtype=np.int64)
+        values = self._frame[column].fillna('').str.lower()
+        prefix = np.flatnonzero(values.str.startswith(query).to_numpy())
+        # Like the trigram index, substring matching needs at least 3 bytes
+        if len(query.encode('utf-8')) >= 3:
+            contains = np.flatnonzero(values.str.contains(query, regex=False).to_numpy())
+        else:
+            contains = np.array([], dtype=np.int64)
+        # Prefix matches first, alphabetically, like the index
+        prefix = prefix[np.argsort(values.to_numpy()[prefix], kind='stable')]
+        return np.concatenate([prefix, contains[~np.isin(contains, prefix)]])[:limit]
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def columnar_path(path):
+    """Directory holding the columnar build of a catalog CSV (foods.csv -> foods.columnar)"""
+    return os.path.splitext(path)[0] + '.columnar'
+
+def build_columnar(path):
+    """Write the columnar build of a catalog CSV, tagged with the CSV's signature"""
+    layout = CATALOG_LAYOUTS.get(os.path.basename(path), {})
+    signature = file_signature(path)
+    write_table(
+        pd.read_csv(path), columnar_path(path),
+        categorical=layout.get('categorical', ()), search=layout.get('search', ()),
+        source=list(signature)
+    )
+
+def _open_columnar(path, signature):
+    """Open the columnar build matching `signature`, building it first if needed
+
+    The build runs under a file lock, so when several server processes
+    start together one of them builds and the others wait, then map it.
+    """
+    directory = columnar_path(path)
+    manifest = read_manifest(directory)
+    if manifest is None or manifest.get('source') != list(signature):
+        with file_lock(directory):
+            manifest = read_manifest(directory)
+            if manifest is None or manifest.get('source') != list(signature):
+                build_columnar(path)
+                manifest = read_manifest(directory)
+    if manifest is None or manifest.get('source') != list(signature):
+        return None  # the CSV changed again during the build
+    return ColumnarTable(directory, manifest)
+
+@timed()
+def _load_catalog(path, signature):
+    """Map the columnar build when enabled and possible, else parse the CSV"""
+    if COLUMNAR_CATALOGS:
+        try:
+            table = _open_columnar(path, signature)
+            if table is not None:
+                return Catalog(path, table.shared_frame(), signature, table)
+        except OSError:
+            pass  # e.g. a read-only directory: fall back to parsing the CSV
+    return Catalog(path, pd.read_csv(path), signature)
+
+def get_catalog(path):
+    """Return the cached Catalog for `path`, reloading only if the file changed"""
+    signature = file_signature(path)
+    catalog = _catalogs.get(path)
+    if catalog is not None and catalog.signature == signature:
+        return catalog
+
+    with span('catalog.lock_wait'):
+        _catalogs_lock.acquire()
+    try:
+        # Another session may have reloaded it while we waited
+        catalog = _catalogs.get(path)
+        if catalog is None or catalog.signature != signature:
+            catalog = _load_catalog(path, signature)
+            _catalogs[path] = catalog
+        return catalog
+    finally:
+        _catalogs_lock.release()
+
+def get_foods_catalog():
+    """Catalog backed by foods.csv"""
+    return get_catalog(FOODS_PATH)
+
+def get_exercises_catalog():
+    """Catalog backed by exercises.csv"""
+    return get_catalog(EXERCISES_PATH)
+
+def clear_catalogs():
+    """Drop every cached catalog (the next access reparses from disk)"""
+    with _catalogs_lock:
+        _catalogs.clear()
@@ -0,0 +1,277 @@
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: text columns are then decoded in Python
+    pa = None
+
+MANIFEST = 'manifest.json'
+
+def _encode_text(values):
+    """UTF-8 blob plus int64 offsets (Arrow-style) for a column of strings"""
+    nulls = pd.isna(values)
+    encoded = [b'' if null else str(v).encode('utf-8') for v, null in zip(values, nulls)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets, np.asarray(nulls, dtype=bool)
+
+def _trigram_codes(keys):
+    """(trigram code, row) pairs for a fixed-width byte-string array, one per distinct pair"""
+    width = keys.dtype.itemsize
+    if width < 3 or not len(keys):
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    raw = keys.view(np.uint8).reshape(len(keys), width).astype(np.int64)
+    codes = (raw[:, :-2] << 16) | (raw[:, 1:-1] << 8) | raw[:, 2:]
+    valid = (raw[:, :-2] > 0) & (raw[:, 1:-1] > 0) & (raw[:, 2:] > 0)  # no NUL padding
+    rows = np.broadcast_to(np.arange(len(keys))[:, None], codes.shape)
+    pairs = np.unique((codes[valid] << 32) | rows[valid])
+    return pairs >> 32, pairs & 0xFFFFFFFF
+
+def _write_text_index(directory, name, values):
+    """Sorted lowercase keys (prefix search) and a trigram index (substring search)"""
+    lower = np.array([('' if pd.isna(v) else str(v)).lower().encode('utf-8') for v in values])
+    if lower.dtype.itemsize == 0:
+        lower = lower.astype('S1')
+    order = np.argsort(lower, kind='stable').astype(np.int32)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    codes, rows = _trigram_codes(lower)
+    keys, starts = np.unique(codes, return_index=True)
+
+    np.save(os.path.join(directory, f'{name}.sorted.npy'), lower[order])
+    np.save(os.path.join(directory, f'{name}.order.npy'), order)
+    np.save(os.path.join(directory, f'{name}.rank.npy'), rank)
+    np.save(os.path.join(directory, f'{name}.tri_keys.npy'), keys)
+    np.save(os.path.join(directory, f'{name}.tri_offsets.npy'), np.append(starts, len(codes)).astype(np.int64))
+    np.save(os.path.join(directory, f'{name}.tri_rows.npy'), rows.astype(np.int32))
+
+def write_table(df, directory, categorical=(), search=(), source=None):
+    """Write a DataFrame as memory-mappable .npy columns plus a JSON manifest
+
+    Numeric columns are stored as-is, `categorical` columns as integer codes
+    with their categories in the manifest, and every other column as a
+    UTF-8 blob with offsets. `search` columns also get a prefix and trigram
+    index. The directory is written next to its final location and swapped
+    in when complete, so readers never see a half-written table.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.columnar-')
+    try:
+        columns = []
+        for name in df.columns:
+            values = df[name]
+            if name in categorical:
+                codes, categories = pd.factorize(values)
+                # The smallest dtype pandas would pick, so pd.Categorical can use the mapped codes as-is
+                dtype = np.int8 if len(categories) < 2 ** 7 else np.int16 if len(categories) < 2 ** 15 else np.int32
+                np.save(os.path.join(tmp, f'{name}.codes.npy'), codes.astype(dtype))
+                columns.append({'name': name, 'kind': 'categorical', 'categories': [str(c) for c in categories]})
+            elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+                np.save(os.path.join(tmp, f'{name}.npy'), values.to_numpy())
+                columns.append({'name': name, 'kind': 'numeric'})
+            else:
+                blob, offsets, nulls = _encode_text(values.to_numpy(dtype=object))
+                np.save(os.path.join(tmp, f'{name}.blob.npy'), blob)
+                np.save(os.path.join(tmp, f'{name}.offsets.npy'), offsets)
+                np.save(os.path.join(tmp, f'{name}.nulls.npy'), nulls)
+                columns.append({'name': name, 'kind': 'text'})
+            if name in search:
+                _write_text_index(tmp, name, values.to_numpy(dtype=object))
+
+        with open(os.path.join(tmp, MANIFEST), 'w') as f:
+            json.dump({'rows': len(df), 'columns': columns, 'search': list(search), 'source': source}, f)
+
+        # Swap the finished directory in place of the old one
+        old = None
+        if os.path.exists(directory):
+            old = tempfile.mkdtemp(dir=parent, prefix='.columnar-old-')
+            os.replace(directory, os.path.join(old, 'table'))
+        os.replace(tmp, directory)
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+def read_manifest(directory):
+    """Return the table's manifest, or None if there is no complete table"""
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class ColumnarTable:
+    """Read-only view of a table written by write_table()
+
+    Every array is opened with np.load(mmap_mode='r'), so opening is
+    O(1) and pages are shared through the OS page cache between every
+    process that opens the same files. Rows are decoded only on access.
+    """
+
+    def __init__(self, directory, manifest=None):
+        self.directory = directory
+        self.manifest = manifest or read_manifest(directory)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No columnar table in {directory}")
+        self.columns = [c['name'] for c in self.manifest['columns']]
+        self._specs = {c['name']: c for c in self.manifest['columns']}
+        self._arrays = {}
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    def _load(self, filename):
+        array = self._arrays.get(filename)
+        if array is None:
+            array = self._arrays.setdefault(
+                filename, np.load(os.path.join(self.directory, filename), mmap_mode='r')
+            )
+        return array
+
+    def codes(self, name):
+        """Integer codes of a categorical column (-1 for missing) and its categories"""
+        return self._load(f'{name}.codes.npy'), self._specs[name]['categories']
+
+    def column(self, name, positions=None):
+        """Decoded values of one column, for all rows or the given positions"""
+        kind = self._specs[name]['kind']
+        if kind == 'numeric':
+            array = self._load(f'{name}.npy')
+            return np.array(array if positions is None else array[positions])
+        if kind == 'categorical':
+            codes, categories = self.codes(name)
+            codes = codes if positions is None else codes[positions]
+            # Code -1 (missing) picks the trailing NaN
+            return np.array(categories + [np.nan], dtype=object)[codes]
+
+        blob, offsets = self._load(f'{name}.blob.npy'), self._load(f'{name}.offsets.npy')
+        nulls = self._load(f'{name}.nulls.npy')
+        rows = range(len(self)) if positions is None else np.asarray(positions).tolist()
+        return np.array([
+            np.nan if nulls[i] else blob[offsets[i]:offsets[i + 1]].tobytes().decode('utf-8')
+            for i in rows
+        ], dtype=object)
+
+    def _arrow_column(self, name, positions=None):
+        """A text or categorical column as an Arrow string array, built from the mapped buffers"""
+        if self._specs[name]['kind'] == 'categorical':
+            codes, categories = self.codes(name)
+            codes = np.asarray(codes if positions is None else codes[positions])
+            return pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0), pa.array(categories, pa.large_string())
+            ).dictionary_decode()
+
+        blob, offsets = self._load(f'{name}.blob.npy'), self._load(f'{name}.offsets.npy')
+        nulls = np.asarray(self._load(f'{name}.nulls.npy'))
+        # Wraps the mapped offsets and blob without copying; only the small validity bitmap is new
+        validity = pa.py_buffer(np.packbits(~nulls, bitorder='little')) if nulls.any() else None
+        array = pa.LargeStringArray.from_buffers(
+            len(self), pa.py_buffer(offsets), pa.py_buffer(blob), null_bitmap=validity
+        )
+        return array if positions is None else array.take(pa.array(np.asarray(positions)))
+
+    def frame(self, positions=None):
+        """DataFrame of all rows (or the given positions), matching pd.read_csv's dtypes"""
+        index = pd.RangeIndex(len(self)) if positions is None else pd.Index(np.asarray(positions))
+        data = {}
+        for name in self.columns:
+            if self._specs[name]['kind'] == 'numeric':
+                data[name] = self.column(name, positions)
+            elif pa is not None:
+                data[name] = pd.array(self._arrow_column(name, positions), dtype='str')
+            else:
+                data[name] = pd.array(self.column(name, positions), dtype='str')
+        return pd.DataFrame(data, index=index)
+
+    def shared_frame(self):
+        """The whole table as a DataFrame backed by the mapped files, without copying
+
+        Numeric columns are the memmaps themselves, text columns Arrow
+        strings over the mapped blobs, and categorical columns
+        pd.Categorical over the mapped codes (so their dtype is 'category',
+        not 'str'). Every process that opens the table shares these pages.
+        Without pyarrow, text has to be decoded and frame() is used instead.
+        """
+        if pa is None:
+            return self.frame()
+        data = {}
+        for name in self.columns:
+            kind = self._specs[name]['kind']
+            if kind == 'numeric':
+                data[name] = np.asarray(self._load(f'{name}.npy'))  # plain ndarray over the map
+            elif kind == 'categorical':
+                codes, categories = self.codes(name)
+                data[name] = pd.Categorical.from_codes(codes, categories)
+            else:
+                data[name] = pd.array(self._arrow_column(name), dtype='str')
+        return pd.DataFrame(data, index=pd.RangeIndex(len(self)), copy=False)
+
+    def text_index(self, name):
+        """TextIndex over a column written with search=[name]"""
+        if name not in self.manifest['search']:
+            return None
+        return TextIndex(self, name)
+
+class TextIndex:
+    """Case-insensitive prefix and substring search over one text column"""
+
+    def __init__(self, table, name):
+        self.sorted = table._load(f'{name}.sorted.npy')
+        self.order = table._load(f'{name}.order.npy')
+        self.rank = table._load(f'{name}.rank.npy')
+        self.tri_keys = table._load(f'{name}.tri_keys.npy')
+        self.tri_offsets = table._load(f'{name}.tri_offsets.npy')
+        self.tri_rows = table._load(f'{name}.tri_rows.npy')
+
+    def prefix(self, query, limit=20):
+        """Positions of values starting with `query`, alphabetically"""
+        key = query.lower().encode('utf-8')
+        if not key:
+            return np.array([], dtype=np.int64)
+        if len(key) > self.sorted.dtype.itemsize:
+            return np.array([], dtype=np.int64)
+        lo = np.searchsorted(self.sorted, key, side='left')
+        hi = np.searchsorted(self.sorted, key + b'\xff', side='left')
+        return np.asarray(self.order[lo:min(hi, lo + limit)], dtype=np.int64)
+
+    def substring(self, query, limit=20):
+        """Positions of values containing `query` (at least 3 bytes), in row order"""
+        key = query.lower().encode('utf-8')
+        if len(key) < 3 or len(key) > self.sorted.dtype.itemsize:
+            return np.array([], dtype=np.int64)
+
+        raw = np.frombuffer(key, dtype=np.uint8).astype(np.int64)
+        codes = np.unique((raw[:-2] << 16) | (raw[1:-1] << 8) | raw[2:])
+        found = np.searchsorted(self.tri_keys, codes)
+        if (found >= len(self.tri_keys)).any() or (self.tri_keys[np.minimum(found, len(self.tri_keys) - 1)] != codes).any():
+            return np.array([], dtype=np.int64)
+
+        # Intersect posting lists, shortest first
+        lists = sorted(
+            (self.tri_rows[self.tri_offsets[i]:self.tri_offsets[i + 1]] for i in found), key=len
+        )
+        candidates = np.asarray(lists[0])
+        for rows in lists[1:]:
+            candidates = candidates[np.isin(candidates, rows, assume_unique=True)]
+            if not len(candidates):
+                return np.array([], dtype=np.int64)
+
+        # Every trigram present does not guarantee the whole query is: verify
+        matches = candidates[np.char.find(self.sorted[self.rank[candidates]], key) >= 0]
+        return matches[:limit].astype(np.int64)
+
+    def search(self, query, limit=20):
+        """Prefix matches first, then other substring matches, at most `limit`"""
+        query = query.strip()
+        prefix = self.prefix(query, limit)
+        if len(prefix) >= limit:
+            return prefix
+        substring = self.substring(query, limit + len(prefix))
+        substring = substring[~np.isin(substring, prefix)]
+        return np.concatenate([prefix, substring])[:limit]
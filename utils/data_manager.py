@@ -1,44 +1,58 @@
+import numpy as np
 import pandas as pd
-import hashlib
 import os
+import threading
 from datetime import datetime
+from utils.storage import create_storage, DuplicateUserError
+from utils.catalog import get_foods_catalog, get_exercises_catalog
+from utils.food_ranking import (
+    build_nutrient_matrix, top_k, diet_key, diet_mask, goal_ordered_positions, SCORERS, DEFAULT_SCORER
+)
+from utils.write_behind import WriteBehindQueue
+from utils.passwords import hash_password, verify_password, needs_rehash, rehash_in_background
+from utils.instrumentation import timed
+
+_storage = None
+
+# Profile saves are written behind by a background thread in batches of up
+# to PROFILE_WRITE_BATCH records, or after PROFILE_WRITE_DELAY_MS
+PROFILE_WRITE_BATCH = int(os.environ.get('HEALTH_MANAGER_PROFILE_WRITE_BATCH', 100))
+PROFILE_WRITE_DELAY_MS = int(os.environ.get('HEALTH_MANAGER_PROFILE_WRITE_DELAY_MS', 50))
+_profile_writes = None
+_profile_writes_lock = threading.Lock()
+
+# Bumped on every profile save so session-level caches can tell they are stale
+_profile_versions = {}
+_profile_versions_lock = threading.Lock()
+
+def get_storage():
+    """Return the process-wide storage backend, creating it on first use"""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+def set_storage(storage):
+    """Replace the process-wide storage backend (used by scripts and benchmarks)"""
+    global _storage
+    _storage = storage
 
 def initialize_data_files():
-    """Initialize CSV files if they don't exist"""
-    
-    # Initialize users.csv
-    if not os.path.exists('users.csv'):
-        users_df = pd.DataFrame(columns=['username', 'password_hash', 'email', 'created_date'])
-        users_df.to_csv('users.csv', index=False)
-    
-    # Initialize user_profiles.csv
-    if not os.path.exists('user_profiles.csv'):
-        profiles_df = pd.DataFrame(columns=[
-            'username', 'age', 'gender', 'height_cm', 'weight_kg', 
-            'activity_level', 'goal', 'diet_preference', 'bmi', 'bmr', 
-            'target_calories', 'created_date'
-        ])
-        profiles_df.to_csv('user_profiles.csv', index=False)
-
-def hash_password(password):
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def verify_password(password, hashed_password):
-    """Verify password against hash"""
-    return hash_password(password) == hashed_password
+    """Initialize the user and profile store if it doesn't exist"""
+    get_storage().initialize()
 
+@timed()
 def create_user(username, password, email):
     """Create a new user"""
     try:
-        users_df = pd.read_csv('users.csv')
+        storage = get_storage()
         
         # Check if username already exists
-        if username in users_df['username'].values:
+        if storage.username_exists(username):
             return False, "Username already exists"
         
         # Check if email already exists
-        if email in users_df['email'].values:
+        if storage.email_exists(email):
             return False, "Email already exists"
         
         # Create new user
@@ -49,25 +63,44 @@ def create_user(username, password, email):
             'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        users_df = pd.concat([users_df, pd.DataFrame([new_user])], ignore_index=True)
-        users_df.to_csv('users.csv', index=False)
+        storage.add_user(new_user)
         
         return True, "User created successfully"
     
+    except DuplicateUserError as e:
+        return False, str(e)
+    
     except Exception as e:
         return False, f"Error creating user: {str(e)}"
 
-def authenticate_user(username, password):
-    """Authenticate user login"""
+def resolve_username(identifier):
+    """Return the username for a login identifier (username or email), or None"""
+    identifier = identifier.strip()
+    storage = get_storage()
+    if storage.username_exists(identifier):
+        return identifier
+    # Usernames can't contain '@', so anything else with one is an email
+    if '@' in identifier:
+        return storage.username_for_email(identifier)
+    return None
+
+@timed()
+def authenticate_user(identifier, password):
+    """Authenticate user login by username or email"""
     try:
-        users_df = pd.read_csv('users.csv')
+        username = resolve_username(identifier)
+        user = get_storage().get_user(username) if username is not None else None
         
-        if username not in users_df['username'].values:
-            return False, "Username not found"
+        if user is None:
+            return False, "Email not found" if '@' in identifier else "Username not found"
         
-        user_row = users_df[users_df['username'] == username].iloc[0]
-        
-        if verify_password(password, user_row['password_hash']):
+        if verify_password(password, user['password_hash']):
+            # Upgrade legacy SHA-256 (or outdated scrypt cost) hashes transparently
+            if needs_rehash(user['password_hash']):
+                storage = get_storage()
+                rehash_in_background(
+                    password, lambda new_hash: storage.update_password_hash(username, new_hash)
+                )
             return True, "Login successful"
         else:
             return False, "Incorrect password"
@@ -75,90 +108,191 @@ def authenticate_user(username, password):
     except Exception as e:
         return False, f"Error during authentication: {str(e)}"
 
-def save_user_profile(username, profile_data):
-    """Save or update user profile"""
+def get_profile_version(username):
+    """Return a counter that changes every time the user's profile is saved"""
+    return _profile_versions.get(username, 0)
+
+def _bump_profile_version(username):
+    with _profile_versions_lock:
+        _profile_versions[username] = _profile_versions.get(username, 0) + 1
+
+def _get_profile_writes():
+    """Return the process-wide write-behind queue for profile saves"""
+    global _profile_writes
+    if _profile_writes is None:
+        with _profile_writes_lock:
+            if _profile_writes is None:
+                _profile_writes = WriteBehindQueue(
+                    lambda profiles: get_storage().upsert_profiles(profiles),
+                    max_batch=PROFILE_WRITE_BATCH,
+                    max_delay_ms=PROFILE_WRITE_DELAY_MS
+                )
+    return _profile_writes
+
+def flush_profile_writes(timeout=None):
+    """Block until every queued profile save has been written to storage"""
+    if _profile_writes is None:
+        return True
+    return _profile_writes.flush(timeout)
+
+@timed()
+def save_user_profile(username, profile_data, wait=False):
+    """Save or update user profile
+    
+    The profile is queued for a background write and visible to
+    get_user_profile immediately. Pass wait=True to block until it is
+    actually stored (and report a storage failure). Without it, a failure
+    is reported once earlier saves are known to be failing; the queued
+    profile is still kept and retried.
+    """
     try:
-        profiles_df = pd.read_csv('user_profiles.csv')
-        
-        # Remove existing profile if it exists
-        profiles_df = profiles_df[profiles_df['username'] != username]
-        
-        # Add new profile
         profile_data['username'] = username
         profile_data['created_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
-        profiles_df = pd.concat([profiles_df, pd.DataFrame([profile_data])], ignore_index=True)
-        profiles_df.to_csv('user_profiles.csv', index=False)
+        # Replace the existing profile if there is one
+        profile_writes = _get_profile_writes()
+        ticket = profile_writes.submit(username, dict(profile_data))
+        _bump_profile_version(username)
+        
+        if wait and not ticket.wait():
+            return False, f"Error saving profile: {ticket.error}"
+        
+        if profile_writes.error is not None:
+            return False, f"Error saving profile: {profile_writes.error}"
         
         return True, "Profile saved successfully"
     
     except Exception as e:
         return False, f"Error saving profile: {str(e)}"
 
+@timed()
 def get_user_profile(username):
     """Get user profile data"""
     try:
-        profiles_df = pd.read_csv('user_profiles.csv')
+        # A queued (not yet written) save takes precedence: read-your-writes
+        profile = _profile_writes.pending(username) if _profile_writes is not None else None
+        if profile is not None:
+            profile = dict(profile)
+        else:
+            profile = get_storage().get_profile(username)
         
-        if username not in profiles_df['username'].values:
+        if profile is None:
             return None, "Profile not found"
         
-        profile = profiles_df[profiles_df['username'] == username].iloc[0]
-        return profile.to_dict(), "Profile found"
+        return profile, "Profile found"
     
     except Exception as e:
         return None, f"Error retrieving profile: {str(e)}"
 
-def get_food_recommendations(diet_preference, goal, limit=10):
-    """Get food recommendations based on diet preference and goal"""
+@timed()
+def log_measurement(username, weight_kg, body_fat_pct=None, waist_cm=None, timestamp=None):
+    """Record a weigh-in in the user's measurement history"""
     try:
-        foods_df = pd.read_csv('foods.csv')
-        
-        # Filter by diet preference
-        if diet_preference == 'vegan':
-            filtered_foods = foods_df[foods_df['diet_type'] == 'vegan']
-        elif diet_preference == 'vegetarian':
-            filtered_foods = foods_df[foods_df['diet_type'].isin(['veg', 'vegan'])]
-        else:  # non-vegetarian
-            filtered_foods = foods_df  # All foods
-        
-        # Filter by goal suitability
-        goal_foods = filtered_foods[
-            (filtered_foods['goal_suitability'] == goal) | 
-            (filtered_foods['goal_suitability'] == 'maintenance')
-        ]
-        
-        # If not enough foods, add more from general foods
-        if len(goal_foods) < limit:
-            additional_foods = filtered_foods[
-                ~filtered_foods.index.isin(goal_foods.index)
-            ].head(limit - len(goal_foods))
-            goal_foods = pd.concat([goal_foods, additional_foods])
-        
-        return goal_foods.head(limit)
+        if timestamp is None:
+            timestamp = datetime.now()
+        get_storage().append_measurement({
+            'username': username,
+            'timestamp': pd.Timestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+            'weight_kg': float(weight_kg),
+            'body_fat_pct': body_fat_pct,
+            'waist_cm': waist_cm
+        })
+        return True, "Measurement saved"
+    
+    except Exception as e:
+        return False, f"Error saving measurement: {str(e)}"
+
+@timed()
+def get_weight_history(username, start=None, end=None):
+    """Get the user's weights with start <= time < end as a float Series indexed by time"""
+    try:
+        def fmt(value):
+            return None if value is None else pd.Timestamp(value).strftime('%Y-%m-%d %H:%M:%S')
+        
+        history = get_storage().get_measurements(username, fmt(start), fmt(end))
+        return pd.Series(
+            history['weight_kg'].to_numpy(dtype=float),
+            index=pd.DatetimeIndex(pd.to_datetime(history['timestamp'])),
+            name='weight_kg'
+        )
+    
+    except Exception as e:
+        return pd.Series(dtype=float, name='weight_kg', index=pd.DatetimeIndex([]))
+
+DIET_PREFERENCES = ['vegetarian', 'non_vegetarian', 'vegan']
+GOALS = ['weight_loss', 'weight_gain', 'muscle_building', 'maintenance']
+
+def _build_food_ranking(foods_df):
+    """Nutrient matrix, diet masks and default-scorer scores for every (diet_preference, goal)"""
+    nutrients = build_nutrient_matrix(foods_df)
+    diet_masks = {diet: diet_mask(foods_df, diet) for diet in DIET_PREFERENCES}
+    scores = {}
+    for diet in DIET_PREFERENCES:
+        for goal in GOALS:
+            scores[(DEFAULT_SCORER, diet, goal)] = np.where(
+                diet_masks[diet], SCORERS[DEFAULT_SCORER](nutrients, goal), -np.inf
+            )
+    return {'nutrients': nutrients, 'diet_masks': diet_masks, 'scores': scores}
+
+def _build_exercise_index(exercises_df):
+    """Materialize the recommendation order for every goal"""
+    allowed = np.ones(len(exercises_df), dtype=bool)
+    return {goal: goal_ordered_positions(exercises_df, allowed, goal) for goal in GOALS}
+
+def get_food_scores(diet_preference, goal, scorer=DEFAULT_SCORER):
+    """Score of every catalog food for a diet preference and goal (-inf outside the diet)
+
+    `scorer` is the name of a registered scorer (see utils.food_ranking)
+    or a callable scorer(nutrients, goal) -> scores.
+    """
+    ranking = get_foods_catalog().index('ranking', _build_food_ranking)
+    key = (scorer, diet_key(diet_preference), goal)
+    scores = ranking['scores'].get(key) if isinstance(scorer, str) else None
+    
+    if scores is None:
+        # Scorer or goal outside the precomputed set: score the whole catalog once
+        score = SCORERS[scorer] if isinstance(scorer, str) else scorer
+        scores = np.where(ranking['diet_masks'][key[1]], score(ranking['nutrients'], goal), -np.inf)
+        if isinstance(scorer, str):
+            ranking['scores'][key] = scores
+    return scores
+
+@timed()
+def get_food_recommendations(diet_preference, goal, limit=10, scorer=DEFAULT_SCORER):
+    """Get the best-scoring foods for a diet preference and goal (scorer as in get_food_scores)"""
+    try:
+        catalog = get_foods_catalog()
+        # Foods outside the diet score -inf and are never returned
+        return catalog.take(top_k(get_food_scores(diet_preference, goal, scorer), limit))
+    
+    except Exception as e:
+        return pd.DataFrame()
+
+@timed()
+def search_foods(query, limit=20):
+    """Foods whose name starts with, then contains, `query` (case-insensitive)"""
+    try:
+        catalog = get_foods_catalog()
+        return catalog.take(catalog.search('food_name', query, limit))
     
     except Exception as e:
         return pd.DataFrame()
 
+@timed()
 def get_exercise_recommendations(goal, limit=8):
     """Get exercise recommendations based on goal"""
     try:
-        exercises_df = pd.read_csv('exercises.csv')
-        
-        # Filter by goal suitability
-        goal_exercises = exercises_df[
-            (exercises_df['goal_suitability'] == goal) | 
-            (exercises_df['goal_suitability'] == 'maintenance')
-        ]
-        
-        # If not enough exercises, add more from general exercises
-        if len(goal_exercises) < limit:
-            additional_exercises = exercises_df[
-                ~exercises_df.index.isin(goal_exercises.index)
-            ].head(limit - len(goal_exercises))
-            goal_exercises = pd.concat([goal_exercises, additional_exercises])
-        
-        return goal_exercises.head(limit)
+        catalog = get_exercises_catalog()
+        index = catalog.index('recommendations', _build_exercise_index)
+        
+        if goal not in index:
+            exercises_df = catalog.view()
+            index[goal] = goal_ordered_positions(
+                exercises_df, np.ones(len(exercises_df), dtype=bool), goal
+            )
+        
+        # Goal-suitable exercises first, padded with general exercises
+        return catalog.take(index[goal][:limit])
     
     except Exception as e:
         return pd.DataFrame()
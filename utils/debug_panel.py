@@ -0,0 +1,28 @@
+import streamlit as st
+from utils import instrumentation
+
+def show():
+    with st.expander("🛠️ Timings (admin)"):
+        summaries = instrumentation.stats()
+        if summaries:
+            st.dataframe(
+                [
+                    {'span': name, **{key: round(value, 2) for key, value in summary.items()}}
+                    for name, summary in summaries.items()
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No spans recorded yet.")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "⬇️ Export JSON", instrumentation.export_json(),
+                file_name="timings.json", mime="application/json"
+            )
+        with col2:
+            if st.button("🔄 Reset Timings"):
+                instrumentation.reset()
+                st.rerun()
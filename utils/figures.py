@@ -0,0 +1,126 @@
+import os
+import threading
+from collections import OrderedDict
+import plotly.express as px
+import plotly.graph_objects as go
+from utils.health_calculator import get_bmi_category, get_macronutrient_split
+from utils.instrumentation import timed
+
+class FigureCache:
+    """LRU cache of Plotly figures, bounded by entry count and serialized size
+
+    Each entry keeps the built Figure together with its JSON serialization.
+    The JSON size is what counts against `max_bytes`, and `get_json()` hands
+    it out without re-serializing. Streamlit's st.plotly_chart re-validates
+    dicts and JSON but not Figure objects, so pages should render the cached
+    Figure itself, and must not modify it.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=16 * 2 ** 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (figure, json)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_entry(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        # Build outside the lock; a concurrent duplicate build is harmless
+        figure = build()
+        entry = (figure, figure.to_json())
+
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._bytes += len(entry[1])
+                while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                    _, (_, evicted_json) = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted_json)
+        return entry
+
+    def get(self, key, build):
+        """Return the Figure cached under `key`, calling build() on a miss"""
+        return self._get_entry(key, build)[0]
+
+    def get_json(self, key, build):
+        """Return the pre-serialized JSON of the figure cached under `key`"""
+        return self._get_entry(key, build)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+figure_cache = FigureCache(
+    max_entries=int(os.environ.get('HEALTH_MANAGER_FIGURE_CACHE_ENTRIES', 256)),
+    max_bytes=int(float(os.environ.get('HEALTH_MANAGER_FIGURE_CACHE_MB', 16)) * 2 ** 20)
+)
+
+@timed()
+def _build_bmi_gauge(bmi):
+    _, bmi_color = get_bmi_category(bmi)
+    fig_bmi = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = bmi,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "BMI Status"},
+        gauge = {
+            'axis': {'range': [None, 40]},
+            'bar': {'color': bmi_color},
+            'steps': [
+                {'range': [0, 18.5], 'color': "#FFF3E0"},
+                {'range': [18.5, 25], 'color': "#E8F5E8"},
+                {'range': [25, 30], 'color': "#FFF3E0"},
+                {'range': [30, 40], 'color': "#FFEBEE"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 30
+            }
+        }
+    ))
+    fig_bmi.update_layout(height=300)
+    return fig_bmi
+
+@timed()
+def _build_macro_pie(goal, target_calories):
+    macros = get_macronutrient_split(goal, target_calories)
+    fig_macro = px.pie(
+        values=[macros['protein'], macros['carbs'], macros['fat']],
+        names=['Protein', 'Carbohydrates', 'Fat'],
+        title="Daily Macronutrient Breakdown (grams)",
+        color_discrete_sequence=['#4CAF50', '#81C784', '#A5D6A7']
+    )
+    fig_macro.update_layout(height=300)
+    return fig_macro
+
+@timed()
+def get_bmi_gauge(bmi):
+    """Cached BMI gauge figure (depends only on the BMI value)"""
+    bmi = float(bmi)
+    return figure_cache.get(('bmi_gauge', bmi), lambda: _build_bmi_gauge(bmi))
+
+@timed()
+def get_macro_pie(goal, target_calories):
+    """Cached macronutrient pie figure for a goal and daily calorie target"""
+    target_calories = float(target_calories)
+    return figure_cache.get(('macro_pie', goal, target_calories), lambda: _build_macro_pie(goal, target_calories))
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from utils.health_calculator import MACRO_RATIOS
+
+NUTRIENT_COLUMNS = ['calories_per_100g', 'protein', 'carbs', 'fat', 'fiber']
+
+# Below this energy density, per-calorie ratios would make e.g. green tea look
+# like the most protein-dense food in the catalog
+MIN_KCAL_FOR_DENSITY = 50
+# Densities (grams per 100 kcal) that earn the full bonus
+PROTEIN_DENSITY_REF = 15.0
+FIBER_DENSITY_REF = 5.0
+ENERGY_DENSITY_REF = 600.0  # kcal per 100 g
+
+# Weight of each score component per goal:
+# (macro fit, protein density, fiber density, energy density, goal suitability)
+SCORE_WEIGHTS = {
+    'weight_loss': (1.0, 0.6, 0.6, -0.3, 0.5),
+    'muscle_building': (1.0, 1.0, 0.2, 0.0, 0.5),
+    'weight_gain': (1.0, 0.3, 0.2, 0.6, 0.5),
+    'maintenance': (1.0, 0.4, 0.4, 0.0, 0.5)
+}
+
+def diet_key(diet_preference):
+    """Anything other than vegan/vegetarian is treated as non-vegetarian"""
+    return diet_preference if diet_preference in ('vegan', 'vegetarian') else 'non_vegetarian'
+
+def diet_mask(foods_df, diet):
+    """Boolean mask of foods allowed for a diet (as returned by diet_key)"""
+    if diet == 'vegan':
+        return (foods_df['diet_type'] == 'vegan').to_numpy()
+    elif diet == 'vegetarian':
+        return foods_df['diet_type'].isin(['veg', 'vegan']).to_numpy()
+    else:  # non-vegetarian
+        return np.ones(len(foods_df), dtype=bool)  # All foods
+
+def goal_ordered_positions(df, allowed, goal):
+    """Positions of allowed rows: goal/maintenance matches first, then the rest, in file order"""
+    goal_mask = (
+        (df['goal_suitability'] == goal) |
+        (df['goal_suitability'] == 'maintenance')
+    ).to_numpy()
+    return np.concatenate([
+        np.flatnonzero(allowed & goal_mask),
+        np.flatnonzero(allowed & ~goal_mask)
+    ])
+
+def build_nutrient_matrix(foods_df):
+    """Per-food nutrient arrays shared by every scorer
+
+    Returns a dict with one float64 array per NUTRIENT_COLUMNS entry plus
+    'goal_suitability' and 'diet_type' as pd.Categorical, so comparing them
+    with a string compares small integer codes. Float columns and codes of
+    a memory-mapped catalog are used as they are, without copying.
+    """
+    nutrients = {column: foods_df[column].to_numpy(dtype=float) for column in NUTRIENT_COLUMNS}
+    nutrients['goal_suitability'] = pd.Categorical(foods_df['goal_suitability'])
+    nutrients['diet_type'] = pd.Categorical(foods_df['diet_type'])
+    return nutrients
+
+def macro_fit_score(nutrients, goal):
+    """Rank by how well a food's calorie split matches the goal's macro split
+
+    Adds bonuses for protein and fiber per calorie, energy density (a
+    bonus for weight gain, a penalty for weight loss) and the food's
+    goal_suitability tag.
+    """
+    protein, carbs, fat = nutrients['protein'], nutrients['carbs'], nutrients['fat']
+    energy = np.maximum(4 * protein + 4 * carbs + 9 * fat, 1e-9)
+    target = MACRO_RATIOS.get(goal, MACRO_RATIOS['maintenance'])
+    distance = (
+        np.abs(4 * protein / energy - target[0]) +
+        np.abs(4 * carbs / energy - target[1]) +
+        np.abs(9 * fat / energy - target[2])
+    )
+    fit = 1 - distance / 2
+
+    kcal = np.maximum(nutrients['calories_per_100g'], MIN_KCAL_FOR_DENSITY)
+    protein_density = np.minimum(protein / kcal * 100 / PROTEIN_DENSITY_REF, 1)
+    fiber_density = np.minimum(nutrients['fiber'] / kcal * 100 / FIBER_DENSITY_REF, 1)
+    energy_density = np.minimum(nutrients['calories_per_100g'] / ENERGY_DENSITY_REF, 1)
+    suitability = np.where(
+        nutrients['goal_suitability'] == goal, 1.0,
+        np.where(nutrients['goal_suitability'] == 'maintenance', 0.5, 0.0)
+    )
+
+    w = SCORE_WEIGHTS.get(goal, SCORE_WEIGHTS['maintenance'])
+    return w[0] * fit + w[1] * protein_density + w[2] * fiber_density + w[3] * energy_density + w[4] * suitability
+
+def goal_match_score(nutrients, goal):
+    """The original ordering: goal/maintenance foods first, then the rest, in file order"""
+    matches = (nutrients['goal_suitability'] == goal) | (nutrients['goal_suitability'] == 'maintenance')
+    return matches.astype(float) - np.arange(len(matches)) / (len(matches) + 1)
+
+SCORERS = {
+    'macro_fit': macro_fit_score,
+    'goal_match': goal_match_score
+}
+DEFAULT_SCORER = 'macro_fit'
+
+def register_scorer(name, scorer):
+    """Make scorer(nutrients, goal) -> array of scores available by name"""
+    SCORERS[name] = scorer
+
+def top_k(scores, k):
+    """Positions of the k highest finite scores, best first (ties in file order)
+
+    np.argpartition selects them in O(n); only the k winners are sorted.
+    """
+    k = min(k, int(np.isfinite(scores).sum()))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    if k < len(scores):
+        positions = np.argpartition(-scores, k - 1)[:k]
+    else:
+        positions = np.flatnonzero(np.isfinite(scores))
+    return positions[np.lexsort((positions, -scores[positions]))]
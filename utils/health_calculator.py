@@ -1,11 +1,52 @@
 import math
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from utils.instrumentation import timed
 
+# Activity multipliers (BMR -> maintenance calories)
+ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'active': 1.725,
+    'very_active': 1.9
+}
+DEFAULT_ACTIVITY_MULTIPLIER = 1.2
+
+# Daily calorie adjustment relative to maintenance
+GOAL_CALORIE_ADJUSTMENTS = {
+    'weight_loss': -500,  # 500 calorie deficit
+    'weight_gain': 500,  # 500 calorie surplus
+    'muscle_building': 300,  # 300 calorie surplus
+    'maintenance': 0
+}
+
+# (protein, carbs, fat) share of daily calories
+MACRO_RATIOS = {
+    'weight_loss': (0.30, 0.40, 0.30),  # Higher protein, moderate carbs, lower fat
+    'muscle_building': (0.35, 0.40, 0.25),  # High protein, moderate carbs, moderate fat
+    'weight_gain': (0.25, 0.45, 0.30),  # Moderate protein, higher carbs, higher fat
+    'maintenance': (0.25, 0.45, 0.30)  # Balanced macros
+}
+
+# BMI category boundaries and the (label, color) for each category code
+BMI_CATEGORY_BOUNDS = [18.5, 25, 30]
+BMI_CATEGORIES = [
+    ("Underweight", "#FF9800"),
+    ("Normal weight", "#4CAF50"),
+    ("Overweight", "#FF9800"),
+    ("Obese", "#F44336")
+]
+
+@timed()
 def calculate_bmi(weight_kg, height_cm):
     """Calculate BMI (Body Mass Index)"""
     height_m = height_cm / 100
     bmi = weight_kg / (height_m ** 2)
     return round(bmi, 1)
 
+@timed()
 def get_bmi_category(bmi):
     """Get BMI category"""
     if bmi < 18.5:
@@ -17,6 +58,7 @@ def get_bmi_category(bmi):
     else:
         return "Obese", "#F44336"
 
+@timed()
 def calculate_bmr(weight_kg, height_cm, age, gender):
     """Calculate Basal Metabolic Rate using Mifflin-St Jeor Equation"""
     if gender.lower() == 'male':
@@ -25,55 +67,22 @@ def calculate_bmr(weight_kg, height_cm, age, gender):
         bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age - 161
     return round(bmr, 0)
 
+@timed()
 def calculate_target_calories(bmr, activity_level, goal):
     """Calculate target calories based on BMR, activity level, and goal"""
     
-    # Activity multipliers
-    activity_multipliers = {
-        'sedentary': 1.2,
-        'light': 1.375,
-        'moderate': 1.55,
-        'active': 1.725,
-        'very_active': 1.9
-    }
-    
     # Calculate maintenance calories
-    maintenance_calories = bmr * activity_multipliers.get(activity_level, 1.2)
+    maintenance_calories = bmr * ACTIVITY_MULTIPLIERS.get(activity_level, DEFAULT_ACTIVITY_MULTIPLIER)
     
-    # Adjust based on goal
-    if goal == 'weight_loss':
-        target_calories = maintenance_calories - 500  # 500 calorie deficit
-    elif goal == 'weight_gain':
-        target_calories = maintenance_calories + 500  # 500 calorie surplus
-    elif goal == 'muscle_building':
-        target_calories = maintenance_calories + 300  # 300 calorie surplus
-    else:  # maintenance
-        target_calories = maintenance_calories
+    # Adjust based on goal (unknown goals are treated as maintenance)
+    target_calories = maintenance_calories + GOAL_CALORIE_ADJUSTMENTS.get(goal, 0)
     
     return round(target_calories, 0)
 
+@timed()
 def get_macronutrient_split(goal, calories):
     """Calculate macronutrient split based on goal"""
-    if goal == 'weight_loss':
-        # Higher protein, moderate carbs, lower fat
-        protein_ratio = 0.30
-        carbs_ratio = 0.40
-        fat_ratio = 0.30
-    elif goal == 'muscle_building':
-        # High protein, moderate carbs, moderate fat
-        protein_ratio = 0.35
-        carbs_ratio = 0.40
-        fat_ratio = 0.25
-    elif goal == 'weight_gain':
-        # Moderate protein, higher carbs, higher fat
-        protein_ratio = 0.25
-        carbs_ratio = 0.45
-        fat_ratio = 0.30
-    else:  # maintenance
-        # Balanced macros
-        protein_ratio = 0.25
-        carbs_ratio = 0.45
-        fat_ratio = 0.30
+    protein_ratio, carbs_ratio, fat_ratio = MACRO_RATIOS.get(goal, MACRO_RATIOS['maintenance'])
     
     protein_calories = calories * protein_ratio
     carbs_calories = calories * carbs_ratio
@@ -90,6 +99,7 @@ def get_macronutrient_split(goal, calories):
         'fat': fat_grams
     }
 
+@timed()
 def get_health_recommendations(bmi, goal):
     """Get health recommendations based on BMI and goal"""
     recommendations = []
@@ -127,3 +137,151 @@ def get_health_recommendations(bmi, goal):
         ])
     
     return recommendations
+
+# Batch (vectorized) variants
+#
+# These take NumPy arrays (or DataFrame columns) and return NumPy arrays.
+# They repeat the scalar arithmetic operation for operation so that every
+# element is bit-for-bit identical to the scalar function's result.
+
+def _round_like_python(values, ndigits):
+    """np.round that returns exactly what Python's round() would for each element"""
+    if ndigits == 0:
+        # rint is already exact round-half-even
+        return np.rint(values)
+    
+    # Same steps as np.round: scale, rint, unscale
+    scale = 10.0 ** ndigits
+    scaled = np.array(values, dtype=float)
+    scaled *= scale
+    rounded = np.rint(scaled, out=np.empty_like(scaled))
+    rounded /= scale
+    
+    # Scaling can only make this disagree with round() when the scaled
+    # value sits (almost) exactly on a .5 boundary; redo those in Python.
+    # The distance from .5 is computed in place to avoid 1M-element temporaries.
+    distance = np.floor(scaled, out=np.empty_like(scaled))
+    np.subtract(scaled, distance, out=distance)
+    distance -= 0.5
+    np.abs(distance, out=distance)
+    suspect = np.flatnonzero(distance < 1e-6)
+    if suspect.size:
+        rounded[suspect] = [round(float(v), ndigits) for v in np.asarray(values)[suspect]]
+    return rounded
+
+# A string column already hash-factorized, so several lookups can share it
+Factorized = namedtuple('Factorized', ['codes', 'uniques'])
+
+def _factorize(keys):
+    """Hash-factorize string keys into (codes, uniques) without copying Series/arrays"""
+    if isinstance(keys, Factorized):
+        return keys
+    if not hasattr(keys, 'dtype'):
+        keys = np.asarray(keys, dtype=object)
+    return Factorized(*pd.factorize(keys))
+
+def _lookup(keys, tables, default):
+    """Map an array of string keys through one or more small dicts
+
+    The keys are hash-factorized once, so each table is applied to the
+    handful of distinct values rather than to every element. `keys` may
+    also be the Factorized result of an earlier _factorize call.
+    """
+    codes, uniques = _factorize(keys)
+    results = []
+    for table, table_default in zip(tables, default):
+        # Append the default for missing keys (factorize codes them as -1)
+        values = np.array([table.get(u, table_default) for u in uniques] + [table_default], dtype=float)
+        results.append(values[codes])
+    return results
+
+def _is_male(gender):
+    """Vectorized gender.lower() == 'male'"""
+    codes, uniques = _factorize(gender)
+    is_male = np.array([str(u).lower() == 'male' for u in uniques] + [False])
+    return is_male[codes]
+
+def calculate_bmi_batch(weight_kg, height_cm):
+    """Vectorized calculate_bmi"""
+    height_m = np.array(height_cm, dtype=float)
+    height_m /= 100
+    np.power(height_m, 2, out=height_m)
+    bmi = np.divide(weight_kg, height_m, out=height_m)
+    return _round_like_python(bmi, 1)
+
+def get_bmi_category_codes(bmi):
+    """Vectorized get_bmi_category, as indexes into BMI_CATEGORIES"""
+    bmi = np.asarray(bmi, dtype=float)
+    # One comparison per bound is far cheaper than np.digitize's binary
+    # search; counting down keeps NaN in the last category, like the else branch
+    codes = np.full(bmi.shape, len(BMI_CATEGORY_BOUNDS), dtype=np.int64)
+    for bound in BMI_CATEGORY_BOUNDS:
+        codes -= bmi < bound
+    return codes
+
+def calculate_bmr_batch(weight_kg, height_cm, age, gender):
+    """Vectorized calculate_bmr (Mifflin-St Jeor)"""
+    # Accumulated in place, in the scalar function's order of operations
+    bmr = np.array(weight_kg, dtype=float)
+    bmr *= 10
+    bmr += 6.25 * np.asarray(height_cm)
+    bmr -= 5 * np.asarray(age)
+    bmr += np.where(_is_male(gender), 5.0, -161.0)
+    return np.rint(bmr, out=bmr)
+
+def calculate_tdee_batch(bmr, activity_level):
+    """Maintenance calories (BMR x activity multiplier), unrounded"""
+    multipliers, = _lookup(activity_level, [ACTIVITY_MULTIPLIERS], [DEFAULT_ACTIVITY_MULTIPLIER])
+    return np.asarray(bmr) * multipliers
+
+def _target_calories_from_tdee(tdee, goal):
+    adjustments, = _lookup(goal, [GOAL_CALORIE_ADJUSTMENTS], [0])
+    return _round_like_python(tdee + adjustments, 0)
+
+def calculate_target_calories_batch(bmr, activity_level, goal):
+    """Vectorized calculate_target_calories"""
+    return _target_calories_from_tdee(calculate_tdee_batch(bmr, activity_level), goal)
+
+def get_macronutrient_split_batch(goal, calories):
+    """Vectorized get_macronutrient_split, returning arrays of grams"""
+    calories = np.asarray(calories)
+    ratios = _lookup(
+        goal,
+        [{g: r[i] for g, r in MACRO_RATIOS.items()} for i in range(3)],
+        MACRO_RATIOS['maintenance']
+    )
+    
+    # Convert to grams (protein: 4 cal/g, carbs: 4 cal/g, fat: 9 cal/g)
+    return {
+        'protein': _round_like_python(calories * ratios[0] / 4, 0),
+        'carbs': _round_like_python(calories * ratios[1] / 4, 0),
+        'fat': _round_like_python(calories * ratios[2] / 9, 0)
+    }
+
+@timed()
+def calculate_health_metrics_batch(profiles):
+    """Recompute every derived metric for a table of profiles
+
+    `profiles` is a DataFrame (or dict of arrays) with weight_kg, height_cm,
+    age, gender, activity_level and goal columns. Returns a dict of arrays.
+    """
+    bmi = calculate_bmi_batch(profiles['weight_kg'], profiles['height_cm'])
+    bmr = calculate_bmr_batch(
+        profiles['weight_kg'], profiles['height_cm'], profiles['age'], profiles['gender']
+    )
+    # Each string column is factorized once and the codes shared by every lookup
+    goal = _factorize(profiles['goal'])
+    tdee = calculate_tdee_batch(bmr, _factorize(profiles['activity_level']))
+    target_calories = _target_calories_from_tdee(tdee, goal)
+    macros = get_macronutrient_split_batch(goal, target_calories)
+    
+    return {
+        'bmi': bmi,
+        'bmi_category': get_bmi_category_codes(bmi),
+        'bmr': bmr,
+        'tdee': tdee,
+        'target_calories': target_calories,
+        'protein_grams': macros['protein'],
+        'carbs_grams': macros['carbs'],
+        'fat_grams': macros['fat']
+    }
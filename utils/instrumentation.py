@@ -0,0 +1,153 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+# Timing spans are recorded only when HEALTH_MANAGER_INSTRUMENTATION=1.
+# Otherwise timed() hands functions back undecorated and span() returns a
+# shared no-op context, so the disabled cost is one attribute check.
+ENABLED = os.environ.get('HEALTH_MANAGER_INSTRUMENTATION', '0') == '1'
+
+# Usernames (comma-separated) allowed to see the timing panel
+ADMINS = frozenset(
+    name.strip() for name in os.environ.get('HEALTH_MANAGER_ADMINS', '').split(',') if name.strip()
+)
+
+# Histogram buckets are powers of 2 ** (1 / BUCKETS_PER_OCTAVE) seconds, so
+# reported percentiles are within ~9% of the true value
+BUCKETS_PER_OCTAVE = 8
+MIN_DURATION_S = 1e-7
+
+class Histogram:
+    """Log-bucketed duration histogram with constant memory per span name"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = math.floor(math.log2(max(seconds, MIN_DURATION_S)) * BUCKETS_PER_OCTAVE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other):
+        """Add every duration recorded by `other` (e.g. a histogram from another process)"""
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def percentile(self, q):
+        """Upper bound (seconds) of the bucket holding the q-th percentile, capped at the max"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+    def summary(self):
+        """count plus total/mean/p50/p95/p99/max in milliseconds"""
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000
+        }
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+def record(name, seconds):
+    """Add one duration to the histogram of span `name`"""
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.record(seconds)
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+_NULL_SPAN = nullcontext()
+
+def span(name):
+    """Context manager timing its block as span `name` (a no-op when disabled)"""
+    return _Span(name) if ENABLED else _NULL_SPAN
+
+def timed(name=None):
+    """Decorator timing every call as span `name` (default: module.function)
+
+    When instrumentation is disabled the function is returned unchanged.
+    """
+    def decorate(func):
+        if not ENABLED:
+            return func
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(span_name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def stats():
+    """{span name: summary} for every recorded span, slowest total first"""
+    with _histograms_lock:
+        summaries = {name: histogram.summary() for name, histogram in _histograms.items()}
+    return dict(sorted(summaries.items(), key=lambda item: -item[1]['total_ms']))
+
+def snapshot():
+    """Copies of every span histogram, safe to pickle and merge elsewhere"""
+    with _histograms_lock:
+        copies = {}
+        for name, histogram in _histograms.items():
+            copies[name] = Histogram()
+            copies[name].merge(histogram)
+        return copies
+
+def export_json(path=None):
+    """Serialize stats() as JSON, writing it to `path` if given"""
+    data = json.dumps({'pid': os.getpid(), 'spans': stats()}, indent=2)
+    if path is not None:
+        with open(path, 'w') as f:
+            f.write(data)
+    return data
+
+def reset():
+    """Drop every recorded span"""
+    with _histograms_lock:
+        _histograms.clear()
+
+def is_admin(username):
+    """Whether `username` may see the timing panel"""
+    return username is not None and username in ADMINS
@@ -0,0 +1,221 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from utils.catalog import get_foods_catalog
+from utils.data_manager import get_food_scores
+from utils.food_ranking import diet_key, top_k
+from utils.health_calculator import get_macronutrient_split
+
+PLAN_NUTRIENT_COLUMNS = ['calories_per_100g', 'protein', 'carbs', 'fat']
+TARGET_NAMES = ['calories', 'protein', 'carbs', 'fat']
+
+# Relative weight of each target in the fit; calories matter most
+TARGET_WEIGHTS = np.array([2.0, 1.0, 1.0, 1.0])
+
+# A plan is "on target" when calories are within 5% and every macro within 10%
+TOLERANCES = np.array([0.05, 0.10, 0.10, 0.10])
+
+# Portion bounds in grams per day; energy-dense categories get smaller maximums
+MIN_PORTION_G = 20
+MAX_PORTION_G = 350
+CATEGORY_MAX_PORTION_G = {
+    'Fats': 40,
+    'Nuts': 60,
+    'Seeds': 40,
+    'Beverages': 500
+}
+PORTION_STEP_G = 5
+
+# Foods below this energy density (e.g. green tea) cannot move the totals
+MIN_ENERGY_PER_100G = 10
+
+# The local search only considers this many foods per (diet, goal): the best
+# by the recommendation score, spread evenly over the categories, so a plan
+# costs the same at any catalog size
+CANDIDATE_FOODS = 60
+
+MAX_PER_CATEGORY = 2
+MEAL_FOODS = 6
+SEARCH_ROUNDS = 8
+SOLVER_ITERATIONS = 80
+
+MEAL_BY_CATEGORY = {
+    'Grains': 'Breakfast',
+    'Dairy': 'Breakfast',
+    'Fruits': 'Snacks',
+    'Nuts': 'Snacks',
+    'Seeds': 'Snacks',
+    'Beverages': 'Snacks',
+    'Legumes': 'Lunch',
+    'Vegetables': 'Lunch',
+    'Protein': 'Dinner',
+    'Fats': 'Dinner'
+}
+MEAL_ORDER = ['Breakfast', 'Lunch', 'Dinner', 'Snacks']
+
+def _build_planner_data(foods_df):
+    """Per-gram nutrient matrix, portion bounds and category codes for every food"""
+    category_codes, _ = pd.factorize(foods_df['category'])
+    upper = foods_df['category'].map(CATEGORY_MAX_PORTION_G).fillna(MAX_PORTION_G).to_numpy(dtype=float)
+    return {
+        'nutrients': foods_df[PLAN_NUTRIENT_COLUMNS].to_numpy(dtype=float) / 100,
+        'lower': np.full(len(foods_df), float(MIN_PORTION_G)),
+        'upper': upper,
+        'categories': category_codes,
+        'order': {}  # (diet_key, goal) -> candidate positions, filled on demand
+    }
+
+def _candidate_positions(scores, categories, limit=CANDIDATE_FOODS):
+    """The best-scoring foods, taking an equal share of `limit` from each category, best first"""
+    codes = np.unique(categories)
+    share = max(limit // max(len(codes), 1), MAX_PER_CATEGORY)
+    positions = np.concatenate(
+        [top_k(np.where(categories == code, scores, -np.inf), share) for code in codes] + [np.array([], dtype=np.int64)]
+    )
+    return positions[np.lexsort((positions, -scores[positions]))][:limit]
+
+def solve_portions(nutrients, lower, upper, targets, iterations=SOLVER_ITERATIONS):
+    """Bounded least-squares gram quantities for a batch of food sets
+
+    nutrients has shape (m, k, 4): per-gram calories/protein/carbs/fat of
+    the k foods in each of m candidate sets, and lower/upper have shape
+    (m, k). Minimizes the weighted relative error against `targets` with
+    projected accelerated gradient descent (FISTA), all m sets at once.
+    Returns (grams of shape (m, k), error of shape (m,)).
+    """
+    scale = TARGET_WEIGHTS / targets
+    G = nutrients * scale  # (m, k, 4): row space is the weighted relative error
+    b = TARGET_WEIGHTS
+    # Gradient of 0.5 * |G^T q - b|^2 is H q - c, so precompute H and c once
+    H = G @ G.transpose(0, 2, 1)
+    c = G @ b
+    # The trace of H bounds its largest eigenvalue, giving a safe step size
+    step = 1.0 / np.maximum(np.trace(H, axis1=1, axis2=2), 1e-12)[:, None]
+
+    q = (lower + upper) / 2
+    y = q.copy()
+    t = 1.0
+    for _ in range(iterations):
+        gradient = (H @ y[:, :, None])[:, :, 0] - c
+        q_next = np.minimum(np.maximum(y - step * gradient, lower), upper)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = q_next + ((t - 1) / t_next) * (q_next - q)
+        q, t = q_next, t_next
+
+    residual = (q[:, None, :] @ G)[:, 0, :] - b
+    return q, (residual ** 2).sum(axis=1)
+
+def _initial_selection(candidates, categories, size):
+    """First `size` candidates in preference order, at most MAX_PER_CATEGORY per category"""
+    chosen = []
+    counts = {}
+    for position in candidates:
+        if counts.get(categories[position], 0) < MAX_PER_CATEGORY:
+            chosen.append(position)
+            counts[categories[position]] = counts.get(categories[position], 0) + 1
+            if len(chosen) == size:
+                return np.array(chosen)
+    # Not enough categories to honour the cap: fill up in preference order
+    rest = [p for p in candidates if p not in chosen]
+    return np.array(chosen + rest[:size - len(chosen)])
+
+def _swap_neighbours(selection, candidates, categories):
+    """Every set that replaces one selected food with one unselected candidate"""
+    outside = np.setdiff1d(candidates, selection, assume_unique=True)
+    k, n_out = len(selection), len(outside)
+    sets = np.repeat(selection[None, :], k * n_out, axis=0)
+    sets[np.arange(k * n_out), np.repeat(np.arange(k), n_out)] = np.tile(outside, k)
+
+    # Drop sets that put more than MAX_PER_CATEGORY foods in one category
+    codes = categories[sets]
+    same = (codes[:, :, None] == codes[:, None, :]).sum(axis=2)
+    current_max = (categories[selection][:, None] == categories[selection][None, :]).sum(axis=1).max()
+    allowed = same.max(axis=1) <= max(MAX_PER_CATEGORY, current_max)
+    return sets[allowed]
+
+def optimize_meal_plan(data, candidates, targets, size=MEAL_FOODS):
+    """Pick `size` foods from `candidates` and their grams to match `targets`
+
+    Starts from the most goal-suitable foods and runs a best-improvement
+    local search: each round evaluates every single-food swap in one
+    vectorized solve and keeps the best, until no swap helps. Returns
+    (positions, grams).
+    """
+    nutrients, lower, upper = data['nutrients'], data['lower'], data['upper']
+    size = min(size, len(candidates))
+    selection = _initial_selection(candidates, data['categories'], size)
+    grams, error = solve_portions(nutrients[selection][None], lower[selection][None], upper[selection][None], targets)
+    grams, error = grams[0], error[0]
+
+    for _ in range(SEARCH_ROUNDS):
+        sets = _swap_neighbours(selection, candidates, data['categories'])
+        if not len(sets):
+            break
+        set_grams, set_errors = solve_portions(nutrients[sets], lower[sets], upper[sets], targets)
+        best = int(np.argmin(set_errors))
+        if set_errors[best] >= error * (1 - 1e-6):
+            break
+        selection, grams, error = sets[best], set_grams[best], set_errors[best]
+
+    return selection, grams
+
+def _round_portions(grams, lower, upper):
+    """Round to PORTION_STEP_G multiples, staying inside the portion bounds"""
+    rounded = np.round(grams / PORTION_STEP_G) * PORTION_STEP_G
+    return np.clip(rounded, np.ceil(lower / PORTION_STEP_G) * PORTION_STEP_G, upper)
+
+@lru_cache(maxsize=1024)
+def _build_plan(diet, goal, target_calories, size, catalog_signature):
+    catalog = get_foods_catalog()
+    data = catalog.index('meal_planner', _build_planner_data)
+    candidates = data['order'].get((diet, goal))
+    if candidates is None:
+        # Foods too low in energy (e.g. green tea) score -inf and are never picked
+        energy = catalog.view()['calories_per_100g'].to_numpy(dtype=float)
+        scores = np.where(energy >= MIN_ENERGY_PER_100G, get_food_scores(diet, goal), -np.inf)
+        candidates = data['order'].setdefault((diet, goal), _candidate_positions(scores, data['categories']))
+    if not len(candidates):
+        return None
+
+    macros = get_macronutrient_split(goal, target_calories)
+    targets = np.array([float(target_calories), macros['protein'], macros['carbs'], macros['fat']])
+    selection, grams = optimize_meal_plan(data, candidates, targets, size)
+    grams = _round_portions(grams, data['lower'][selection], data['upper'][selection])
+
+    foods = catalog.take(selection)[['food_name', 'category']].reset_index(drop=True)
+    foods.insert(0, 'meal', foods['category'].map(MEAL_BY_CATEGORY).fillna('Snacks'))
+    foods['grams'] = grams
+    provided = data['nutrients'][selection] * grams[:, None]
+    for i, name in enumerate(TARGET_NAMES):
+        foods[name] = provided[:, i].round(1)
+    foods = foods.sort_values('meal', key=lambda meals: meals.map(MEAL_ORDER.index), kind='stable').reset_index(drop=True)
+
+    totals = provided.sum(axis=0)
+    return {
+        'foods': foods,
+        'totals': dict(zip(TARGET_NAMES, totals.round(1).tolist())),
+        'targets': dict(zip(TARGET_NAMES, targets.tolist())),
+        'within_tolerance': bool((np.abs(totals - targets) <= TOLERANCES * targets).all())
+    }
+
+def generate_meal_plan(diet_preference, goal, target_calories, size=MEAL_FOODS):
+    """Build a one-day meal plan that hits the calorie and macro targets
+
+    Foods are chosen among the CANDIDATE_FOODS best-scoring ones for the
+    diet preference and goal, and plans are cached per (diet, goal,
+    target calories) until foods.csv changes. Returns a dict with 'foods'
+    (DataFrame of meal, food_name, category, grams and the nutrients each
+    portion provides), 'totals' and 'targets' (calories/protein/carbs/fat),
+    and 'within_tolerance'. Returns None if no foods match the diet
+    preference or the plan cannot be built.
+    """
+    try:
+        catalog = get_foods_catalog()
+        plan = _build_plan(diet_key(diet_preference), goal, float(target_calories), size, catalog.signature)
+        if plan is None:
+            return None
+        # The cached frame is shared; hand out a copy
+        return dict(plan, foods=plan['foods'].copy())
+    
+    except Exception as e:
+        return None
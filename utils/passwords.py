@@ -0,0 +1,103 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# scrypt cost. SCRYPT_N is the knob to tune against measured login latency
+# (see scripts/benchmark_login.py): each doubling roughly doubles both the
+# time and the memory (128 * N * r bytes) of one hash.
+SCRYPT_N = int(os.environ.get('HEALTH_MANAGER_SCRYPT_N', 2 ** 14))
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+
+# Hashes run on a small dedicated pool: hashlib.scrypt releases the GIL,
+# and the pool bounds how many memory-hard hashes can run at once
+KDF_WORKERS = int(os.environ.get('HEALTH_MANAGER_KDF_WORKERS', min(4, os.cpu_count() or 1)))
+_kdf_pool = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix='kdf')
+
+# Successful verifications, keyed by an HMAC of (stored hash, password) under
+# a per-process random key, so repeat logins skip the KDF. Failed attempts
+# are never cached and always pay the full cost.
+VERIFY_CACHE_SIZE = 1024
+_verify_cache = OrderedDict()
+_verify_cache_lock = threading.Lock()
+_verify_cache_key = secrets.token_bytes(32)
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii')
+
+def _scrypt(password, salt, n, r, p):
+    # scrypt needs about 128 * n * r bytes; leave headroom for p and the work buffers
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=128 * r * (n + p + 2) + 2 ** 20, dklen=32
+    )
+
+def _hash_password_sync(password):
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(digest)}"
+
+def _verify_password_sync(password, hashed_password):
+    if hashed_password.startswith('scrypt$'):
+        _, n, r, p, salt, digest = hashed_password.split('$')
+        candidate = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(candidate, base64.b64decode(digest))
+
+    # Legacy unsalted SHA-256 hex digest
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(legacy, hashed_password)
+
+def hash_password(password):
+    """Hash password using salted scrypt"""
+    return _kdf_pool.submit(_hash_password_sync, password).result()
+
+def verify_password(password, hashed_password):
+    """Verify password against an scrypt or legacy SHA-256 hash"""
+    if not isinstance(hashed_password, str):
+        return False
+
+    cache_key = hmac.new(
+        _verify_cache_key, f"{hashed_password}\0{password}".encode(), hashlib.sha256
+    ).digest()
+    with _verify_cache_lock:
+        if cache_key in _verify_cache:
+            _verify_cache.move_to_end(cache_key)
+            return True
+
+    if not _kdf_pool.submit(_verify_password_sync, password, hashed_password).result():
+        return False
+
+    with _verify_cache_lock:
+        _verify_cache[cache_key] = True
+        while len(_verify_cache) > VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+    return True
+
+def needs_rehash(hashed_password):
+    """True for legacy hashes and scrypt hashes made with different cost settings"""
+    return not hashed_password.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+def rehash_in_background(password, store):
+    """Hash `password` on the KDF pool and pass the new hash to store(new_hash)
+
+    Used to upgrade legacy hashes after a successful login without making
+    the user wait for a second KDF run. Failures are ignored; the upgrade
+    is simply retried on the next login.
+    """
+    def rehash():
+        try:
+            store(_hash_password_sync(password))
+        except Exception:
+            pass
+    _kdf_pool.submit(rehash)
+
+def clear_verification_cache():
+    """Forget every cached successful verification"""
+    with _verify_cache_lock:
+        _verify_cache.clear()
@@ -0,0 +1,27 @@
+import streamlit as st
+from utils.data_manager import get_user_profile, get_profile_version
+
+def get_session_profile(username):
+    """Get user profile data, reusing this session's copy until the profile is saved again"""
+    cache = st.session_state.setdefault('profile_cache', {})
+    
+    # Read the version before loading so a concurrent save forces a reload next time
+    version = get_profile_version(username)
+    entry = cache.get(username)
+    if entry is not None and entry[0] == version:
+        return entry[1], entry[2]
+    
+    profile, message = get_user_profile(username)
+    if profile is not None:
+        cache[username] = (version, profile, message)
+    return profile, message
+
+def invalidate_session_profile(username=None):
+    """Drop the cached profile for `username` (or every cached profile)"""
+    cache = st.session_state.get('profile_cache')
+    if not cache:
+        return
+    if username is None:
+        cache.clear()
+    else:
+        cache.pop(username, None)
@@ -0,0 +1,672 @@
+import csv
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from utils.instrumentation import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+USER_COLUMNS = ['username', 'password_hash', 'email', 'created_date']
+
+PROFILE_COLUMNS = [
+    'username', 'age', 'gender', 'height_cm', 'weight_kg',
+    'activity_level', 'goal', 'diet_preference', 'bmi', 'bmr',
+    'target_calories', 'created_date'
+]
+
+MEASUREMENT_COLUMNS = ['username', 'timestamp', 'weight_kg', 'body_fat_pct', 'waist_cm']
+
+class DuplicateUserError(ValueError):
+    """Raised by add_user when the username or email is already registered"""
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on `path`.lock for the duration of the block"""
+    with open(path + '.lock', 'a') as lock_file:
+        if fcntl is not None:
+            with span('storage.file_lock_wait'):
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+class GroupCommit:
+    """Coalesce concurrent writes into as few flushes as possible
+
+    Records submitted while a flush is in progress are collected into the
+    next batch, which the first waiting thread then writes in one go, so N
+    concurrent saves cost one or two rewrites instead of N. submit() returns
+    once the caller's record has been written (or raises its batch's error).
+    """
+
+    def __init__(self, flush):
+        self._flush = flush  # flush(dict of key -> record)
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._next_batch = 1  # batch that newly submitted records join
+        self._written = 0  # highest batch id that has been flushed
+        self._writing = False
+        self._errors = {}
+        self.flushes = 0
+
+    def submit(self, records):
+        """Write a dict of key -> record, returning once it is on disk"""
+        with self._cond:
+            self._pending.update(records)
+            batch = self._next_batch
+            while self._written < batch:
+                if self._writing:
+                    self._cond.wait()
+                else:
+                    self._write_pending()
+            error = self._errors.get(batch)
+        if error is not None:
+            raise error
+
+    def _write_pending(self):
+        """Flush everything pending as one batch (called with the condition held)"""
+        records, self._pending = self._pending, {}
+        batch = self._next_batch
+        self._next_batch += 1
+        self._writing = True
+        self._cond.release()
+        error = None
+        try:
+            self._flush(records)
+        except Exception as e:
+            error = e
+        finally:
+            self._cond.acquire()
+            self._writing = False
+            self._written = batch
+            self.flushes += 1
+            if error is not None:
+                self._errors[batch] = error
+            # Only recent batches can still have waiters
+            for old in [b for b in self._errors if b < batch - 64]:
+                del self._errors[old]
+            self._cond.notify_all()
+
+class StorageBackend:
+    """Interface shared by every user/profile storage engine"""
+
+    def initialize(self):
+        """Create the underlying files or tables if they don't exist"""
+        raise NotImplementedError
+
+    def get_user(self, username):
+        """Return the user record as a dict, or None"""
+        raise NotImplementedError
+
+    def username_exists(self, username):
+        raise NotImplementedError
+
+    def email_exists(self, email):
+        raise NotImplementedError
+
+    def username_for_email(self, email):
+        """Return the username registered with `email`, or None"""
+        raise NotImplementedError
+
+    def add_user(self, user):
+        """Insert a new user record, raising DuplicateUserError if the username or email is taken"""
+        raise NotImplementedError
+
+    def update_password_hash(self, username, password_hash):
+        """Replace the stored password hash of an existing user"""
+        raise NotImplementedError
+
+    def get_profile(self, username):
+        """Return the profile record as a dict, or None"""
+        raise NotImplementedError
+
+    def upsert_profile(self, profile):
+        """Insert or replace the profile for profile['username']"""
+        raise NotImplementedError
+
+    def upsert_profiles(self, profiles):
+        """Insert or replace several profiles in one write"""
+        raise NotImplementedError
+
+    def iter_profiles(self, chunksize=100000):
+        """Yield the whole profile table as DataFrames of at most `chunksize` rows"""
+        raise NotImplementedError
+
+    def append_measurement(self, measurement):
+        """Append one weigh-in (username, 'YYYY-MM-DD HH:MM:SS' timestamp, weight_kg, optional body metrics)"""
+        raise NotImplementedError
+
+    def get_measurements(self, username, start=None, end=None):
+        """Return the user's weigh-ins with start <= timestamp < end, ordered by time
+
+        start/end are 'YYYY-MM-DD HH:MM:SS' strings (or None for unbounded).
+        Only the requested window is read.
+        """
+        raise NotImplementedError
+
+    def rewrite_profiles(self, transform, chunksize=100000):
+        """Stream every profile through transform(chunk) -> chunk and store the result atomically
+
+        Returns the number of rows written. Either every chunk is stored or
+        (on error) none are.
+        """
+        raise NotImplementedError
+
+class CSVStorage(StorageBackend):
+    """Original flat-file store: users.csv and user_profiles.csv"""
+
+    MAX_CACHED_PARTITIONS = 24
+
+    def __init__(self, users_path='users.csv', profiles_path='user_profiles.csv',
+                 history_dir='weight_history'):
+        self.users_path = users_path
+        self.profiles_path = profiles_path
+        # Weigh-ins are partitioned into one append-only file per month
+        self.history_dir = history_dir
+        self._partitions = {}
+        self._lock = threading.RLock()
+        # User index: username -> byte offset of its row, email -> username,
+        # plus the file position (inode, byte offset) they were built up to
+        self._user_offsets = None
+        self._email_usernames = None
+        self._users_inode = None
+        self._users_offset = 0
+        self._profile_writer = GroupCommit(self._flush_profiles)
+
+    def initialize(self):
+        if not os.path.exists(self.users_path):
+            pd.DataFrame(columns=USER_COLUMNS).to_csv(self.users_path, index=False)
+        if not os.path.exists(self.profiles_path):
+            pd.DataFrame(columns=PROFILE_COLUMNS).to_csv(self.profiles_path, index=False)
+        os.makedirs(self.history_dir, exist_ok=True)
+        with self._lock:
+            self._sync_user_index()
+
+    def _read_profiles(self):
+        with span('storage.read_profiles_csv'):
+            return pd.read_csv(self.profiles_path)
+
+    def get_user(self, username):
+        with self._lock, open(self.users_path, 'rb') as f:
+            # Sync against the open file, so the offset matches the bytes we read
+            self._sync_user_index(f=f)
+            offset = self._user_offsets.get(username)
+            if offset is None:
+                return None
+            f.seek(offset)
+            row = _parse_csv_line(f.readline())
+            return {name: row[i] if i < len(row) else None for name, i in self._user_fields.items()}
+
+    def _sync_user_index(self, locked=False, f=None):
+        """Bring the username/email index up to date with users.csv
+
+        The index is built from the whole file once; after that only rows
+        appended since the last sync (by this or another process) are read.
+        Pass locked=True when holding the file lock, so a final row without
+        a trailing newline is known to be complete.
+        """
+        if f is None:
+            with open(self.users_path, 'rb') as f:
+                return self._sync_user_index(locked, f)
+
+        stat = os.fstat(f.fileno())
+        if self._user_offsets is not None and stat.st_ino == self._users_inode:
+            if stat.st_size == self._users_offset:
+                return
+            start = self._users_offset
+        else:
+            # First use, or the file was replaced: rebuild from scratch
+            self._user_offsets = {}
+            self._email_usernames = {}
+            self._user_fields = {name: i for i, name in enumerate(USER_COLUMNS)}
+            start = 0
+
+        f.seek(start)
+        data = f.read()
+        if not locked:
+            # Only consume complete lines; a row still being written is picked up next time
+            data = data[:data.rfind(b'\n') + 1]
+        username_i = self._user_fields['username']
+        email_i = self._user_fields['email']
+        position = start
+        for line in io.BytesIO(data):
+            row_start, position = position, position + len(line)
+            row = _parse_csv_line(line)
+            if row_start == 0:
+                self._user_fields = {name: i for i, name in enumerate(row)}
+                username_i = self._user_fields['username']
+                email_i = self._user_fields['email']
+            elif len(row) > max(username_i, email_i):
+                # Like a scan of the file, the first row for a username or email wins
+                self._user_offsets.setdefault(row[username_i], row_start)
+                self._email_usernames.setdefault(row[email_i], row[username_i])
+        self._users_offset = position
+        self._users_inode = stat.st_ino
+
+    def username_exists(self, username):
+        with self._lock:
+            self._sync_user_index()
+            return username in self._user_offsets
+
+    def email_exists(self, email):
+        with self._lock:
+            self._sync_user_index()
+            return email in self._email_usernames
+
+    def username_for_email(self, email):
+        with self._lock:
+            self._sync_user_index()
+            return self._email_usernames.get(email)
+
+    def add_user(self, user):
+        with self._lock, file_lock(self.users_path):
+            # Re-check under the lock so concurrent signups can't both win
+            self._sync_user_index(locked=True)
+            if user['username'] in self._user_offsets:
+                raise DuplicateUserError("Username already exists")
+            if user['email'] in self._email_usernames:
+                raise DuplicateUserError("Email already exists")
+
+            header = sorted(self._user_fields, key=self._user_fields.get)
+            with open(self.users_path, 'a+', newline='') as f:
+                # Make sure we don't glue the new row onto an unterminated last line
+                if self._users_offset > 0:
+                    f.seek(self._users_offset - 1)
+                    if f.read(1) != '\n':
+                        f.write(os.linesep)
+                f.flush()
+                row_start = os.fstat(f.fileno()).st_size
+                csv.writer(f, lineterminator=os.linesep).writerow(
+                    [user.get(name, '') for name in header]
+                )
+                f.flush()
+                os.fsync(f.fileno())
+                self._users_offset = os.fstat(f.fileno()).st_size
+
+            self._user_offsets[user['username']] = row_start
+            self._email_usernames[user['email']] = user['username']
+
+    def update_password_hash(self, username, password_hash):
+        with self._lock, file_lock(self.users_path):
+            users_df = pd.read_csv(self.users_path, dtype=str, keep_default_na=False)
+            users_df.loc[users_df['username'] == username, 'password_hash'] = password_hash
+            _replace_csv(users_df, self.users_path)
+
+    def get_profile(self, username):
+        profiles_df = self._read_profiles()
+        matches = profiles_df[profiles_df['username'] == username]
+        if matches.empty:
+            return None
+        return matches.iloc[0].to_dict()
+
+    def upsert_profile(self, profile):
+        self._profile_writer.submit({profile['username']: profile})
+
+    def upsert_profiles(self, profiles):
+        self._profile_writer.submit({profile['username']: profile for profile in profiles})
+
+    def _flush_profiles(self, profiles):
+        """Apply a batch of upserts with one locked read-modify-write of the file"""
+        with file_lock(self.profiles_path):
+            profiles_df = self._read_profiles()
+            profiles_df = profiles_df[~profiles_df['username'].isin(list(profiles))]
+            profiles_df = pd.concat(
+                [profiles_df, pd.DataFrame(list(profiles.values()))], ignore_index=True
+            )
+            _replace_csv(profiles_df, self.profiles_path)
+
+    def iter_profiles(self, chunksize=100000):
+        yield from pd.read_csv(self.profiles_path, chunksize=chunksize)
+
+    def rewrite_profiles(self, transform, chunksize=100000):
+        rows = 0
+        with self._lock, file_lock(self.profiles_path):
+            directory = os.path.dirname(os.path.abspath(self.profiles_path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', newline='') as tmp:
+                    header = True
+                    for chunk in pd.read_csv(self.profiles_path, chunksize=chunksize):
+                        transform(chunk).to_csv(tmp, index=False, header=header)
+                        header = False
+                        rows += len(chunk)
+                    tmp.flush()
+                    os.fsync(tmp.fileno())
+                os.replace(tmp_path, self.profiles_path)
+                _fsync_directory(directory)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return rows
+
+    def _partition_path(self, month):
+        return os.path.join(self.history_dir, f'{month}.csv')
+
+    def append_measurement(self, measurement):
+        path = self._partition_path(measurement['timestamp'][:7])
+        with self._lock, file_lock(path):
+            new_file = not os.path.exists(path)
+            with open(path, 'a', newline='') as f:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                if new_file:
+                    writer.writerow(MEASUREMENT_COLUMNS)
+                writer.writerow([_to_csv_value(measurement.get(c)) for c in MEASUREMENT_COLUMNS])
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _partition_index(self, month):
+        """Per-user (timestamps, rows) for one month, reparsed only when the file changes"""
+        path = self._partition_path(month)
+        signature = file_signature(path)
+        cached = self._partitions.get(month)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        df = pd.read_csv(path, dtype={'username': str, 'timestamp': str})
+        df = df.sort_values('timestamp', kind='stable').drop_duplicates(['username', 'timestamp'], keep='last')
+        index = {username: group.reset_index(drop=True) for username, group in df.groupby('username', sort=False)}
+        self._partitions.pop(month, None)
+        self._partitions[month] = (signature, index)
+        while len(self._partitions) > self.MAX_CACHED_PARTITIONS:
+            # Evict the least recently (re)loaded month
+            del self._partitions[next(iter(self._partitions))]
+        return index
+
+    def get_measurements(self, username, start=None, end=None):
+        if not os.path.isdir(self.history_dir):
+            return pd.DataFrame(columns=MEASUREMENT_COLUMNS)
+        # Partition files are named YYYY-MM.csv, so the window maps to a range of names
+        months = sorted(name[:-4] for name in os.listdir(self.history_dir) if name.endswith('.csv'))
+        months = [
+            m for m in months
+            if (start is None or m >= start[:7]) and (end is None or m <= end[:7])
+        ]
+        frames = []
+        with self._lock:
+            for month in months:
+                rows = self._partition_index(month).get(username)
+                if rows is None:
+                    continue
+                timestamps = rows['timestamp'].to_numpy()
+                lo = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+                hi = len(rows) if end is None else np.searchsorted(timestamps, end, side='left')
+                frames.append(rows.iloc[lo:hi])
+        if not frames:
+            return pd.DataFrame(columns=MEASUREMENT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+class SQLiteStorage(StorageBackend):
+    """Indexed SQLite store (WAL mode), seeded from the CSV files on first use"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password_hash TEXT NOT NULL,
+        email TEXT NOT NULL,
+        created_date TEXT
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users(email);
+    CREATE TABLE IF NOT EXISTS user_profiles (
+        username TEXT PRIMARY KEY,
+        age INTEGER,
+        gender TEXT,
+        height_cm INTEGER,
+        weight_kg REAL,
+        activity_level TEXT,
+        goal TEXT,
+        diet_preference TEXT,
+        bmi REAL,
+        bmr REAL,
+        target_calories REAL,
+        created_date TEXT
+    );
+    CREATE TABLE IF NOT EXISTS measurements (
+        username TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        weight_kg REAL NOT NULL,
+        body_fat_pct REAL,
+        waist_cm REAL,
+        PRIMARY KEY (username, timestamp)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path='health_manager.db', users_csv='users.csv',
+                 profiles_csv='user_profiles.csv'):
+        self.db_path = db_path
+        self.users_csv = users_csv
+        self.profiles_csv = profiles_csv
+        self._local = threading.local()
+
+    def _connect(self):
+        # Streamlit runs each session in its own thread, and sqlite3
+        # connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def initialize(self):
+        conn = self._connect()
+        with conn:
+            conn.executescript(self.SCHEMA)
+        self._import_csv('users', self.users_csv, USER_COLUMNS)
+        self._import_csv('user_profiles', self.profiles_csv, PROFILE_COLUMNS)
+
+    def _import_csv(self, table, csv_path, columns):
+        """Copy rows from the legacy CSV file into an empty table"""
+        conn = self._connect()
+        if conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone() is not None:
+            return
+        if not os.path.exists(csv_path):
+            return
+        df = pd.read_csv(csv_path)
+        if df.empty:
+            return
+        df = df.reindex(columns=columns).astype(object).where(df.notna(), None)
+        placeholders = ', '.join('?' for _ in columns)
+        with conn:
+            conn.executemany(
+                f'INSERT OR IGNORE INTO {table} ({", ".join(columns)}) VALUES ({placeholders})',
+                [tuple(_to_python(v) for v in row) for row in df.itertuples(index=False)]
+            )
+
+    def get_user(self, username):
+        row = self._connect().execute(
+            'SELECT * FROM users WHERE username = ?', (username,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def username_exists(self, username):
+        return self._connect().execute(
+            'SELECT 1 FROM users WHERE username = ?', (username,)
+        ).fetchone() is not None
+
+    def email_exists(self, email):
+        return self._connect().execute(
+            'SELECT 1 FROM users WHERE email = ?', (email,)
+        ).fetchone() is not None
+
+    def username_for_email(self, email):
+        row = self._connect().execute(
+            'SELECT username FROM users WHERE email = ?', (email,)
+        ).fetchone()
+        return row['username'] if row is not None else None
+
+    def add_user(self, user):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT INTO users (username, password_hash, email, created_date) VALUES (?, ?, ?, ?)',
+                    tuple(user[c] for c in USER_COLUMNS)
+                )
+        except sqlite3.IntegrityError:
+            if self.username_exists(user['username']):
+                raise DuplicateUserError("Username already exists")
+            raise DuplicateUserError("Email already exists")
+
+    def update_password_hash(self, username, password_hash):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'UPDATE users SET password_hash = ? WHERE username = ?', (password_hash, username)
+            )
+
+    def get_profile(self, username):
+        row = self._connect().execute(
+            'SELECT * FROM user_profiles WHERE username = ?', (username,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def upsert_profile(self, profile):
+        self.upsert_profiles([profile])
+
+    def upsert_profiles(self, profiles):
+        conn = self._connect()
+        placeholders = ', '.join('?' for _ in PROFILE_COLUMNS)
+        with conn:
+            conn.executemany(
+                f'INSERT OR REPLACE INTO user_profiles ({", ".join(PROFILE_COLUMNS)}) VALUES ({placeholders})',
+                [tuple(_to_python(profile.get(c)) for c in PROFILE_COLUMNS) for profile in profiles]
+            )
+
+    def iter_profiles(self, chunksize=100000):
+        conn = self._connect()
+        last = None
+        while True:
+            chunk = self._read_profile_page(conn, last, chunksize)
+            if chunk.empty:
+                return
+            yield chunk
+            last = chunk['username'].iloc[-1]
+
+    def _read_profile_page(self, conn, after, limit):
+        """Keyset-paginated read ordered by the username primary key"""
+        if after is None:
+            return pd.read_sql_query(
+                'SELECT * FROM user_profiles ORDER BY username LIMIT ?', conn, params=(limit,)
+            )
+        return pd.read_sql_query(
+            'SELECT * FROM user_profiles WHERE username > ? ORDER BY username LIMIT ?',
+            conn, params=(after, limit)
+        )
+
+    def rewrite_profiles(self, transform, chunksize=100000):
+        conn = self._connect()
+        placeholders = ', '.join('?' for _ in PROFILE_COLUMNS)
+        sql = f'INSERT OR REPLACE INTO user_profiles ({", ".join(PROFILE_COLUMNS)}) VALUES ({placeholders})'
+        rows = 0
+        last = None
+        # One write transaction: readers keep seeing the old table until COMMIT
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            while True:
+                chunk = self._read_profile_page(conn, last, chunksize)
+                if chunk.empty:
+                    break
+                last = chunk['username'].iloc[-1]
+                out = transform(chunk).reindex(columns=PROFILE_COLUMNS)
+                conn.executemany(sql, [
+                    tuple(_to_python(v) for v in row)
+                    for row in out.astype(object).where(out.notna(), None).itertuples(index=False)
+                ])
+                rows += len(chunk)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return rows
+
+    def append_measurement(self, measurement):
+        conn = self._connect()
+        placeholders = ', '.join('?' for _ in MEASUREMENT_COLUMNS)
+        with conn:
+            conn.execute(
+                f'INSERT OR REPLACE INTO measurements ({", ".join(MEASUREMENT_COLUMNS)}) VALUES ({placeholders})',
+                tuple(_to_python(measurement.get(c)) for c in MEASUREMENT_COLUMNS)
+            )
+
+    def get_measurements(self, username, start=None, end=None):
+        # The (username, timestamp) primary key turns this into one index range scan
+        sql = 'SELECT * FROM measurements WHERE username = ?'
+        params = [username]
+        if start is not None:
+            sql += ' AND timestamp >= ?'
+            params.append(start)
+        if end is not None:
+            sql += ' AND timestamp < ?'
+            params.append(end)
+        return pd.read_sql_query(sql + ' ORDER BY timestamp', self._connect(), params=params)
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, which changes whenever the file is rewritten"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _parse_csv_line(line):
+    """Fields of one raw CSV line (bytes)"""
+    return next(csv.reader([line.decode('utf-8')]), [])
+
+def _to_csv_value(value):
+    return '' if value is None else value
+
+def _replace_csv(df, path):
+    """Write `df` to a temp file next to `path`, fsync it, then atomically swap it in
+
+    Readers see either the old or the new file, never a partial one.
+    Callers must hold file_lock(path) so concurrent writers don't lose updates.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as tmp:
+            df.to_csv(tmp, index=False)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+def _fsync_directory(directory):
+    """Persist a rename (no-op where directories can't be opened, e.g. Windows)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _to_python(value):
+    """Convert numpy scalars to plain Python values sqlite3 can bind"""
+    return value.item() if hasattr(value, 'item') else value
+
+STORAGE_BACKENDS = {
+    'sqlite': SQLiteStorage,
+    'csv': CSVStorage
+}
+
+def create_storage(name=None):
+    """Create the backend named by `name` or HEALTH_MANAGER_STORAGE (default: sqlite)"""
+    name = (name or os.environ.get('HEALTH_MANAGER_STORAGE', 'sqlite')).lower()
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name}")
+    return STORAGE_BACKENDS[name]()
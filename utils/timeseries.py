@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last point and, for each of the n_out - 2 buckets in
+    between, the point forming the largest triangle with the previously
+    kept point and the average of the next bucket. Preserves the visual
+    shape (peaks and dips) of a line far better than striding.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)])
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i < n_out - 3:
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+def minmax_indices(y, n_out):
+    """Indices of the min and max point of each of n_out // 2 equal-count buckets"""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    n_buckets = max(n_out // 2, 1)
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    kept = [0, n - 1]
+    for lo, hi in zip(starts[:-1], starts[1:]):
+        if hi > lo:
+            kept.append(lo + int(np.argmin(y[lo:hi])))
+            kept.append(lo + int(np.argmax(y[lo:hi])))
+    return np.unique(kept)
+
+def downsample_indices(times, values, max_points, method='lttb'):
+    """Indices of at most `max_points` points to plot from a time series"""
+    if method == 'minmax':
+        return minmax_indices(values, max_points)
+    # Relative float seconds keep the triangle areas well conditioned
+    x = (np.asarray(times, dtype='datetime64[ns]') - np.datetime64(0, 'ns')).astype(np.int64)
+    x = (x - x[0]) / 1e9 if len(x) else x.astype(float)
+    return lttb_indices(x, values, max_points)
+
+def bucket_stats(times, values, n_buckets):
+    """Min, max and mean of `values` over n_buckets equal-count buckets
+
+    Returns a DataFrame indexed by each bucket's first timestamp. Computed
+    with ufunc.reduceat, so it is a single vectorized pass.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    n_buckets = max(min(n_buckets, n), 1)
+    if n == 0:
+        return pd.DataFrame(columns=['min', 'max', 'mean'])
+    starts = np.unique(np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1])
+    counts = np.diff(np.append(starts, n))
+    return pd.DataFrame({
+        'min': np.minimum.reduceat(values, starts),
+        'max': np.maximum.reduceat(values, starts),
+        'mean': np.add.reduceat(values, starts) / counts
+    }, index=pd.DatetimeIndex(np.asarray(times)[starts]))
+
+class RollingTrends:
+    """Time-windowed rolling means (e.g. 7 and 30 days) extended point by point
+
+    extend() only processes points newer than the last one seen, keeping a
+    running sum and window start per window, so adding k new weigh-ins
+    costs O(k) no matter how long the history already is.
+    """
+
+    def __init__(self, windows_days=(7, 30), origin=None):
+        self.windows_days = tuple(windows_days)
+        self.origin = origin  # earliest timestamp this tracker was built from (None: all time)
+        self._window_ns = [pd.Timedelta(days=d).value for d in self.windows_days]
+        self._times = []
+        self._values = []
+        self._starts = [0] * len(self.windows_days)
+        self._sums = [0.0] * len(self.windows_days)
+        self._trends = [[] for _ in self.windows_days]
+
+    def __len__(self):
+        return len(self._times)
+
+    @property
+    def last_timestamp(self):
+        return pd.Timestamp(self._times[-1]) if self._times else None
+
+    def covers(self, start):
+        """True if this tracker already includes every point from `start` on"""
+        return self.origin is None or (start is not None and self.origin <= start)
+
+    def extend(self, series):
+        """Add the points of a time-indexed series that are newer than the last one seen"""
+        times = pd.DatetimeIndex(series.index).as_unit('ns').asi8
+        values = series.to_numpy(dtype=float)
+        last = self._times[-1] if self._times else None
+        for t, v in zip(times, values):
+            if last is not None and t <= last:
+                continue
+            self._times.append(t)
+            self._values.append(v)
+            i = len(self._times) - 1
+            for w, window_ns in enumerate(self._window_ns):
+                self._sums[w] += v
+                while self._times[self._starts[w]] <= t - window_ns:
+                    self._sums[w] -= self._values[self._starts[w]]
+                    self._starts[w] += 1
+                self._trends[w].append(self._sums[w] / (i + 1 - self._starts[w]))
+            last = t
+
+    def latest(self):
+        """Most recent rolling mean per window, e.g. {7: 70.1, 30: 70.6}"""
+        return {d: trend[-1] for d, trend in zip(self.windows_days, self._trends) if trend}
+
+    def frame(self, start=None):
+        """DataFrame of weight plus trend_<N>d columns from `start` on, indexed by time"""
+        times = np.asarray(self._times, dtype='datetime64[ns]')
+        lo = 0 if start is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(start), 'ns')))
+        data = {'weight_kg': np.asarray(self._values[lo:], dtype=float)}
+        for d, trend in zip(self.windows_days, self._trends):
+            data[f'trend_{d}d'] = np.asarray(trend[lo:], dtype=float)
+        return pd.DataFrame(data, index=pd.DatetimeIndex(times[lo:]))
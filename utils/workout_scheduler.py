@@ -0,0 +1,148 @@
+from functools import lru_cache
+import numpy as np
+from utils.catalog import get_exercises_catalog
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Weekly exercise burn per kg of body weight, and training days per week
+WEEKLY_BURN_PER_KG = {
+    'weight_loss': 35,
+    'muscle_building': 22,
+    'weight_gain': 15,
+    'maintenance': 25
+}
+TRAINING_DAYS = {
+    'weight_loss': 6,
+    'muscle_building': 5,
+    'weight_gain': 4,
+    'maintenance': 5
+}
+
+# calories_per_hour in exercises.csv is for a person of this weight
+REFERENCE_WEIGHT_KG = 70
+# Schedules are cached per weight bucket rather than per exact weight
+WEIGHT_BUCKET_KG = 5
+
+SESSION_EXERCISES = 3
+MAX_SESSION_MINUTES = 90
+MINUTE_STEP = 5
+# Each exercise may be shortened or lengthened within this range of its listed duration
+DURATION_RANGE = (0.5, 2.0)
+
+INTENSITY_ORDER = {'Low': 0, 'Medium': 1, 'High': 2}
+
+def _suitability_weights(exercises_df, goal):
+    """Sampling weight per exercise: goal matches first, maintenance next, then the rest"""
+    suitability = exercises_df['goal_suitability']
+    return np.where(suitability == goal, 4.0, np.where(suitability == 'maintenance', 2.0, 1.0))
+
+def _training_days(goal):
+    """Indices into DAYS of the training days, spread evenly through the week"""
+    n = TRAINING_DAYS.get(goal, TRAINING_DAYS['maintenance'])
+    return set(np.round(np.linspace(0, 7, n, endpoint=False)).astype(int).tolist())
+
+def _plan_day(rng, weights, burn_per_minute, durations, muscles, blocked, budget):
+    """Pick one day's exercises (positions) and minutes, avoiding `blocked` muscles"""
+    available = weights * ~np.isin(muscles, list(blocked))
+    chosen = []
+    burn = 0.0
+    minutes = 0
+    while len(chosen) < SESSION_EXERCISES and burn < budget and available.sum() > 0:
+        position = int(rng.choice(len(available), p=available / available.sum()))
+        chosen.append(position)
+        burn += burn_per_minute[position] * durations[position]
+        minutes += durations[position]
+        available[position] = 0
+        if minutes >= MAX_SESSION_MINUTES:
+            break
+
+    chosen = np.array(chosen, dtype=int)
+    if not len(chosen):
+        return chosen, np.array([])
+    # Stretch or shorten the listed durations so the day lands on its budget
+    factor = np.clip(budget / max(burn, 1e-9), *DURATION_RANGE)
+    factor = min(factor, MAX_SESSION_MINUTES / durations[chosen].sum())
+    minutes = np.maximum(np.round(durations[chosen] * factor / MINUTE_STEP) * MINUTE_STEP, MINUTE_STEP)
+    return chosen, minutes
+
+def _balance_week(days, minutes, burn_per_minute, durations, target):
+    """Rescale every exercise's minutes together so the week's burn meets `target`
+
+    Days that could not reach their own budget are made up for by the
+    others, within DURATION_RANGE and MAX_SESSION_MINUTES per day.
+    """
+    total = (burn_per_minute * minutes).sum()
+    if total <= 0:
+        return minutes
+    low, high = DURATION_RANGE
+    scaled = np.clip(minutes * target / total, durations * low, durations * high)
+    day_minutes = np.bincount(days, weights=scaled, minlength=7)
+    scaled *= np.minimum(MAX_SESSION_MINUTES / np.maximum(day_minutes[days], 1), 1)
+    return np.maximum(np.round(scaled / MINUTE_STEP) * MINUTE_STEP, MINUTE_STEP)
+
+@lru_cache(maxsize=1024)
+def _build_schedule(goal, weight_bucket, seed, catalog_signature):
+    catalog = get_exercises_catalog()
+    exercises_df = catalog.view()
+    weight = weight_bucket * WEIGHT_BUCKET_KG
+    weights = _suitability_weights(exercises_df, goal)
+    burn_per_minute = exercises_df['calories_per_hour'].to_numpy(dtype=float) / 60 * weight / REFERENCE_WEIGHT_KG
+    durations = exercises_df['duration_minutes'].to_numpy(dtype=float)
+    muscles = exercises_df['target_muscle'].to_numpy()
+
+    target = WEEKLY_BURN_PER_KG.get(goal, WEEKLY_BURN_PER_KG['maintenance']) * weight
+    training = _training_days(goal)
+    budget = target / len(training)
+    rng = np.random.default_rng(seed)
+
+    day_muscles = {}
+    days, positions, minutes = [], [], []
+    used = np.ones(len(weights))
+    for day in sorted(training):
+        # Muscles trained the day before, and for Sunday also Monday (the week repeats)
+        blocked = set(day_muscles.get(day - 1, ()))
+        if day == 6:
+            blocked |= set(day_muscles.get(0, ()))
+        chosen, day_minutes = _plan_day(rng, weights * used, burn_per_minute, durations, muscles, blocked, budget)
+        used[chosen] *= 0.3  # favour variety across the week
+        day_muscles[day] = muscles[chosen].tolist()
+        days.extend([day] * len(chosen))
+        positions.extend(chosen.tolist())
+        minutes.extend(day_minutes.tolist())
+
+    days, positions, minutes = np.array(days), np.array(positions, dtype=int), np.array(minutes)
+    minutes = _balance_week(days, minutes, burn_per_minute[positions], durations[positions], target)
+
+    sessions = catalog.take(positions)[['exercise_name', 'category', 'intensity', 'target_muscle']]
+    sessions.insert(0, 'day', [DAYS[d] for d in days])
+    sessions['minutes'] = minutes.astype(int)
+    sessions['calories'] = np.round(burn_per_minute[positions] * minutes).astype(int)
+    # Day by day, warming up with the lighter work first
+    order = np.lexsort((sessions['intensity'].map(INTENSITY_ORDER).to_numpy(), days))
+    sessions = sessions.iloc[order].reset_index(drop=True)
+    return {
+        'sessions': sessions,
+        'rest_days': [DAYS[d] for d in range(7) if d not in training],
+        'total_calories': int(sessions['calories'].sum()),
+        'target_calories': int(round(target))
+    }
+
+def generate_weekly_schedule(goal, weight_kg, seed=0):
+    """Build a 7-day workout schedule that meets the goal's weekly calorie burn
+
+    The same (goal, weight bucket, seed) always yields the same schedule,
+    and schedules are cached on that key. No muscle group is trained on
+    two consecutive days (Sunday to Monday included). Returns a dict with
+    'sessions' (DataFrame of day, exercise_name, category, intensity,
+    target_muscle, minutes, calories), 'rest_days', 'total_calories' and
+    'target_calories', or None if the schedule cannot be built.
+    """
+    try:
+        catalog = get_exercises_catalog()
+        weight_bucket = max(int(round(float(weight_kg) / WEIGHT_BUCKET_KG)), 1)
+        schedule = _build_schedule(goal, weight_bucket, int(seed), catalog.signature)
+        # The cached frame is shared; hand out a copy
+        return dict(schedule, sessions=schedule['sessions'].copy())
+
+    except Exception as e:
+        return None
@@ -0,0 +1,124 @@
+import atexit
+import queue
+import threading
+import time
+
+class WriteTicket:
+    """Handle for one queued record; wait() blocks until it has been written"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.error = None
+
+    def wait(self, timeout=None):
+        """Return True once written successfully (False on timeout or failure)"""
+        return self._done.wait(timeout) and self.error is None
+
+    def _finish(self, error=None):
+        self.error = error
+        self._done.set()
+
+class WriteBehindQueue:
+    """Background writer that batches keyed upserts
+
+    submit() only enqueues the record and returns a WriteTicket. A daemon
+    thread collects records until it has `max_batch` of them or
+    `max_delay_ms` has passed since the first one, keeps the latest record
+    per key, and hands the batch to write_batch(list_of_records) in one
+    call. Until a record is written, pending(key) returns it, so readers in
+    this process always see their own writes.
+
+    A batch that still fails after its retries is not dropped: its records
+    stay pending and are retried with the next batch (or flush). Until
+    they are written, `error` holds the failure and flush() returns False.
+    """
+
+    def __init__(self, write_batch, max_batch=100, max_delay_ms=50, maxsize=10000, retries=3):
+        self._write_batch = write_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.retries = retries
+        self._queue = queue.Queue(maxsize=maxsize)  # bounded: submit() blocks when full
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._unwritten = {}  # key -> record of failed batches, retried with the next one
+        self.error = None
+        self.last_error = None
+        self.batches_written = 0
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush, 5)
+
+    def submit(self, key, record):
+        """Queue `record` for writing and return its WriteTicket"""
+        ticket = WriteTicket()
+        with self._pending_lock:
+            self._pending[key] = record
+        self._queue.put((key, record, ticket))
+        return ticket
+
+    def pending(self, key):
+        """Return the not-yet-written record for `key`, or None"""
+        with self._pending_lock:
+            return self._pending.get(key)
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far has been written
+
+        Returns False on timeout or if any record is still unwritten
+        because the storage kept failing.
+        """
+        ticket = WriteTicket()
+        self._queue.put((None, None, ticket))
+        return ticket.wait(timeout)
+
+    def _collect(self):
+        """Block for the first item, then gather more until the batch is full or the deadline passes"""
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(items) < self.max_batch and items[-1][0] is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            # Latest record per key wins; flush markers (key None) carry no record
+            latest = dict(self._unwritten)
+            for key, record, _ in items:
+                if key is not None:
+                    latest[key] = record
+
+            if latest:
+                self.error = self._write(list(latest.values()))
+                if self.error is not None:
+                    # Keep them pending (and readable) until a later batch succeeds
+                    self._unwritten = latest
+                else:
+                    self._unwritten = {}
+                    with self._pending_lock:
+                        for key, record in latest.items():
+                            # Keep the overlay entry if a newer record arrived meanwhile
+                            if self._pending.get(key) is record:
+                                del self._pending[key]
+
+            for _, _, ticket in items:
+                ticket._finish(self.error)
+
+    def _write(self, records):
+        """Write one batch, retrying with backoff; returns the final error or None"""
+        for attempt in range(self.retries + 1):
+            try:
+                self._write_batch(records)
+                self.batches_written += 1
+                return None
+            except Exception as e:
+                self.last_error = e
+                time.sleep(min(0.05 * 2 ** attempt, 1))
+        return self.last_error